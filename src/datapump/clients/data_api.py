@@ -47,6 +47,8 @@ class DataApiClient:
     def get_1x1_asset(self, dataset: str, version: str) -> str:
         # geostore and gadm are special
         if dataset == "geostore":
+            # full analyses stay on TSV, which all historical geostore feature
+            # files are in. Parquet feature files have a TSV copy next to them.
             return (
                 f"s3://{GLOBALS.s3_bucket_pipeline}/geotrellis/features/geostore/*.tsv"
             )
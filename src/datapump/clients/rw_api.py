@@ -1,9 +1,13 @@
 import csv
 import io
 import json
+import threading
+import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..globals import GLOBALS, LOGGER
 from ..util.exceptions import UnexpectedResponseError
@@ -12,6 +16,7 @@ from ..util.util import api_prefix, get_date_string
 from .aws import get_secrets_manager_client
 
 TOKEN = None
+SESSION = None
 
 
 def token() -> str:
@@ -22,6 +27,24 @@ def token() -> str:
     return TOKEN
 
 
+def session() -> requests.Session:
+    """
+    Shared HTTP session, so concurrent requests to the RW API reuse pooled
+    keep-alive connections
+    """
+    global SESSION
+    if SESSION is None:
+        SESSION = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=GLOBALS.rw_api_max_workers,
+            pool_maxsize=GLOBALS.rw_api_max_workers,
+        )
+        SESSION.mount("https://", adapter)
+        SESSION.mount("http://", adapter)
+
+    return SESSION
+
+
 def _get_token() -> str:
     response = get_secrets_manager_client().get_secret_value(
         SecretId=GLOBALS.token_secret_id
@@ -30,7 +53,32 @@ def _get_token() -> str:
     return json.loads(response["SecretString"])["token"]
 
 
-def update_area_statuses(geostore_ids, status):
+class RateLimiter:
+    """
+    Space out calls across threads so no more than `rate` start per second
+    """
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def update_area_statuses(geostore_ids, status, batch_size=None):
+    """
+    Update status of user areas, sending batches of geostore IDs per request.
+    Batches are sent concurrently under a rate limit. If a batch fails, its
+    geostores are retried one by one so failures are reported per ID.
+    """
     url = f"https://{api_prefix()}-api.globalforestwatch.org/v2/area/update"
 
     headers = {
@@ -38,20 +86,53 @@ def update_area_statuses(geostore_ids, status):
         "Authorization": f"Bearer {token()}",
     }
 
-    errors = False
-    for gid in geostore_ids:
-        r = requests.post(
-            url,
-            json=_update_aoi_statuses_payload([gid], status),
-            headers=headers,
-        )
+    geostore_ids = list(geostore_ids)
+    batch_size = batch_size or GLOBALS.rw_api_status_batch_size
+    batches = [
+        geostore_ids[i : i + batch_size]
+        for i in range(0, len(geostore_ids), batch_size)
+    ]
+    rate_limiter = RateLimiter(GLOBALS.rw_api_max_requests_per_second)
 
-        if r.status_code != 200:
+    def _post(gids):
+        rate_limiter.wait()
+        try:
+            r = session().post(
+                url,
+                json=_update_aoi_statuses_payload(gids, status),
+                headers=headers,
+            )
+            return r.status_code
+        except requests.exceptions.RequestException as e:
+            LOGGER.error(f"Status update request failed: {e}")
+            return None
+
+    def _update_batch(gids):
+        status_code = _post(gids)
+        if status_code == 200:
+            return []
+        elif len(gids) == 1:
             LOGGER.error(
-                f"Status update failed for geostore {gid} with {r.status_code}"
+                f"Status update failed for geostore {gids[0]} with {status_code}"
             )
+            return gids
+
+        LOGGER.warning(
+            f"Status update failed for batch of {len(gids)} geostores with {status_code}, "
+            "retrying geostores individually"
+        )
+        return [gid for gid in gids if _update_batch([gid])]
 
+    with ThreadPoolExecutor(max_workers=GLOBALS.rw_api_max_workers) as executor:
+        failed_ids = [
+            gid for failed in executor.map(_update_batch, batches) for gid in failed
+        ]
+
+    errors = len(failed_ids) > 0
     if errors:
+        LOGGER.error(
+            f"Status update to {status} failed for {len(failed_ids)} of {len(geostore_ids)} geostores"
+        )
         slack_webhook(
             "WARNING", "Some user areas could not have statuses updated. See logs."
         )
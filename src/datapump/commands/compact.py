@@ -0,0 +1,28 @@
+from enum import Enum
+from typing import List
+
+from datapump.util.models import StrictBaseModel
+
+
+class FireAlertType(str, Enum):
+    viirs = "viirs"
+    modis = "modis"
+
+
+class CompactionPeriod(str, Enum):
+    """
+    Time span of alerts merged into each compacted near real time file
+    """
+
+    day = "day"
+    month = "month"
+
+
+class CompactParameters(StrictBaseModel):
+    alert_types: List[FireAlertType]
+    period: CompactionPeriod = CompactionPeriod.day
+
+
+class CompactCommand(StrictBaseModel):
+    command: str
+    parameters: CompactParameters
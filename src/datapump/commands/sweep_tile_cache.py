@@ -0,0 +1,20 @@
+from typing import Literal, Optional
+
+from pydantic import PositiveInt
+
+from datapump.util.models import StrictBaseModel
+
+
+class SweepTileCacheParameters(StrictBaseModel):
+    """
+    Tile cache entries older than ttl_days are deleted, which defaults to the
+    TTL of the cache
+    """
+
+    ttl_days: Optional[PositiveInt] = None
+
+
+class SweepTileCacheCommand(StrictBaseModel):
+    # parameters are all optional, so only the command tells it apart
+    command: Literal["sweep_tile_cache"]
+    parameters: SweepTileCacheParameters = SweepTileCacheParameters()
@@ -1,9 +1,9 @@
 import json
 import logging
 import os
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseSettings, Field, PositiveInt
+from pydantic import BaseSettings, Field, PositiveFloat, PositiveInt
 
 LOGGER = logging.getLogger("datapump")
 LOGGER.setLevel(logging.DEBUG)
@@ -55,6 +55,72 @@ class Globals(EnvSettings):
         else None
     )
 
+    # size in degrees of the grid cells user areas are tiled into, must evenly
+    # divide or be a multiple of 1, e.g. 0.25, 0.5, 1 or 10
+    rw_areas_grid_size: PositiveFloat = Field(1.0, env="RW_AREAS_GRID_SIZE")
+    # clipped cells with more vertices are split into sub-cells, so single rows
+    # don't become straggler tasks in Geotrellis
+    rw_areas_max_vertices: Optional[PositiveInt] = Field(
+        100_000, env="RW_AREAS_MAX_VERTICES"
+    )
+    # optionally snap coordinates of tiled user areas to a grid of this size in
+    # degrees and simplify them within a tolerance, to shrink the feature files
+    rw_areas_coordinate_precision: Optional[PositiveFloat] = Field(
+        None, env="RW_AREAS_COORDINATE_PRECISION"
+    )
+    rw_areas_simplify_tolerance: Optional[PositiveFloat] = Field(
+        None, env="RW_AREAS_SIMPLIFY_TOLERANCE"
+    )
+    # write RW areas feature files of syncs as TSV with hex WKB, or as GeoParquet
+    # with WKB bytes, which requires pyarrow and a Geotrellis jar reading Parquet.
+    # Full geostore analyses read the TSV copies written next to Parquet files.
+    rw_areas_feature_format: Literal["tsv", "parquet"] = Field(
+        "tsv", env="RW_AREAS_FEATURE_FORMAT"
+    )
+    # only dilate/erode user area geometries that cheap checks flag as invalid or
+    # as having slivers, small holes or close parts, instead of every geometry
+    rw_areas_repair_fast_path: bool = Field(True, env="RW_AREAS_REPAIR_FAST_PATH")
+    # max number of geostores per RW areas feature file and analysis job
+    rw_areas_shard_size: PositiveInt = Field(1500, env="RW_AREAS_SHARD_SIZE")
+    # only tile and analyze one of the user areas with identical geometries
+    rw_areas_dedup_geometries: bool = Field(True, env="RW_AREAS_DEDUP_GEOMETRIES")
+    # reuse rows of geostores tiled by previous runs, for up to the TTL
+    rw_areas_tile_cache: bool = Field(True, env="RW_AREAS_TILE_CACHE")
+    rw_areas_tile_cache_ttl_days: PositiveInt = Field(
+        30, env="RW_AREAS_TILE_CACHE_TTL_DAYS"
+    )
+    # stage geostores in S3 to be tiled in parallel by the tiler Lambda, in
+    # chunks of rw_areas_tiling_chunk_size geostores
+    rw_areas_distributed_tiling: bool = Field(
+        False, env="RW_AREAS_DISTRIBUTED_TILING"
+    )
+    rw_areas_tiling_chunk_size: PositiveInt = Field(
+        100, env="RW_AREAS_TILING_CHUNK_SIZE"
+    )
+    # tile user areas in batches of this many geostores when a Lambda deadline
+    # is given, and checkpoint the rest if the next batch might not finish
+    rw_areas_checkpoint_batch_size: PositiveInt = Field(
+        20, env="RW_AREAS_CHECKPOINT_BATCH_SIZE"
+    )
+    # seconds before a Lambda times out that long running work stops, to save
+    # its progress
+    lambda_deadline_margin_sec: PositiveInt = Field(
+        60, env="LAMBDA_DEADLINE_MARGIN_SEC"
+    )
+    # number of processes used to tile user areas, defaults to the number of CPUs
+    rw_areas_tiling_processes: Optional[PositiveInt] = Field(
+        None, env="RW_AREAS_TILING_PROCESSES"
+    )
+
+    # concurrency and block size of requests to the RW API
+    rw_api_max_workers: PositiveInt = Field(8, env="RW_API_MAX_WORKERS")
+    geostore_block_size: PositiveInt = Field(25, env="GEOSTORE_BLOCK_SIZE")
+    rw_areas_page_size: PositiveInt = Field(25, env="RW_AREAS_PAGE_SIZE")
+    rw_api_status_batch_size: PositiveInt = Field(100, env="RW_API_STATUS_BATCH_SIZE")
+    rw_api_max_requests_per_second: PositiveFloat = Field(
+        10, env="RW_API_MAX_REQUESTS_PER_SECOND"
+    )
+
     max_versions: int = Field(4, env="MAX_VERSIONS")
     datapump_table_name: Optional[str] = Field(env="DATAPUMP_TABLE_NAME")
 
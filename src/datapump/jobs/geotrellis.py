@@ -23,6 +23,7 @@ from ..jobs.jobs import (
     Partition,
     Partitions,
 )
+from ..sync.manifests import expand_geostore_aliases, get_geostore_aliases
 from botocore.exceptions import ClientError
 import time
 
@@ -114,6 +115,10 @@ class GeotrellisJob(Job):
             status = self.check_analysis()
             if status == JobStatus.complete:
                 if not self.result_tables:
+                    # syncs and full analyses of user areas alike
+                    if self.feature_type == GeotrellisFeatureType.geostore:
+                        self._expand_geostore_aliases()
+
                     self.result_tables = self._get_result_tables()
 
                 self.upload()
@@ -369,6 +374,25 @@ class GeotrellisJob(Job):
         else:
             return GeotrellisFeatureType.feature
 
+    def _expand_geostore_aliases(self) -> None:
+        """
+        User areas with identical geometries are only analyzed once, so copy
+        their results to every geostore sharing the geometry before upload.
+        Full analyses read every feature file, and use the aliases of all of them.
+        """
+        aliases = get_geostore_aliases(self.features_1x1)
+        if not aliases:
+            return
+
+        result_path = self._get_result_path(include_analysis=True)
+        bucket, prefix = get_s3_path_parts(result_path)
+
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                if item["Key"].endswith(".csv"):
+                    expand_geostore_aliases(f"s3://{bucket}/{item['Key']}", aliases)
+
     def _get_result_tables(self) -> List[AnalysisResultTable]:
         result_path = self._get_result_path(include_analysis=True)
         bucket, prefix = get_s3_path_parts(result_path)
@@ -725,6 +749,9 @@ class GeotrellisJob(Job):
         resp = get_s3_client().head_object(Bucket=bucket, Key=key)
         return resp["ContentLength"]
 
+    def _get_feature_format(self) -> str:
+        return "parquet" if self.features_1x1.endswith(".parquet") else "tsv"
+
     def _get_step(self) -> Dict[str, Any]:
         analysis = GeotrellisAnalysis[self.table.analysis].value
         if "firealerts" in analysis:
@@ -753,6 +780,11 @@ class GeotrellisJob(Job):
             self.feature_type.value.split("_")[0],
         ]
 
+        # TSV is the default input format of the jar
+        if self._get_feature_format() == "parquet":
+            step_args.append("--feature_format")
+            step_args.append("parquet")
+
         # These limit the extent to look at for certain types of analyses
         if self.table.analysis == Analysis.tcl:
             step_args.append("--tcl")
@@ -785,6 +817,10 @@ class GeotrellisJob(Job):
         result_path = f"s3://{GLOBALS.s3_bucket_pipeline}/geotrellis/results/{version}/{self.table.dataset}/{self.analysis_version}"
         if self.sync_type:
             result_path += f"/{self.sync_type.value}"
+        if self.sync_type == SyncType.rw_areas:
+            # RW areas syncs run a job per shard of geostores, which must not
+            # write to or upload the results of each other
+            result_path += f"/{Path(self.features_1x1).stem}"
         if include_analysis:
             result_path += f"/{GeotrellisAnalysis[self.table.analysis].value}"
 
@@ -1,19 +1,32 @@
 import csv
 import io
+import json
 import os
-import shutil
+import re
+import struct
 import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import requests
-import shapefile
 
 from ..clients.aws import get_s3_client
-from ..globals import LOGGER
+from ..globals import GLOBALS, LOGGER
 
-ACTIVE_FIRE_ALERTS_7D_SHAPEFILE_URLS = {
-    "modis": "https://firms2.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/shapes/zips/MODIS_C6_1_Global_7d.zip",
-    "viirs": "https://firms2.modaps.eosdis.nasa.gov/data/active_fire/suomi-npp-viirs-c2/shapes/zips/SUOMI_VIIRS_C2_Global_7d.zip",
+ACTIVE_FIRE_ALERTS_SHAPEFILE_URLS = {
+    "modis": "https://firms2.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/shapes/zips/MODIS_C6_1_Global_{window}.zip",
+    "viirs": "https://firms2.modaps.eosdis.nasa.gov/data/active_fire/suomi-npp-viirs-c2/shapes/zips/SUOMI_VIIRS_C2_Global_{window}.zip",
 }
+# time spans covered by the FIRMS feeds, from smallest to largest
+FEED_WINDOWS = {
+    "24h": timedelta(hours=24),
+    "48h": timedelta(hours=48),
+    "7d": timedelta(days=7),
+}
+# alerts show up in the feeds hours after acquisition, so a window must cover
+# the time since the last saved alert by this much
+FEED_WINDOW_MARGIN = timedelta(hours=6)
 
 DATA_LAKE_BUCKET = os.environ["S3_BUCKET_DATA_LAKE"]
 BRIGHTNESS_FIELDS = {
@@ -22,46 +35,60 @@ BRIGHTNESS_FIELDS = {
 }
 VERSIONS = {"modis": "v6", "viirs": "v1"}
 SHP_NAMES = {
-    "viirs": "SUOMI_VIIRS_C2_Global_7d.shp",
-    "modis": "MODIS_C6_1_Global_7d.shp",
+    "viirs": "SUOMI_VIIRS_C2_Global_{window}.shp",
+    "modis": "MODIS_C6_1_Global_{window}.shp",
 }
 
+# near real time files are named after their first and last alert times
+NRT_FILE_NAME = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})-(\d{4})_(\d{4}-\d{2}-\d{2})-(\d{4})\.tsv$"
+)
+
 TEMP_DIR = "/tmp"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# fields of the TSV taken from the points instead of the .dbf file
+POINT_FIELDS = {"latitude", "longitude"}
+POINT_SHAPE_TYPE = 1
+# record header, shape type and coordinates of each point in a .shp file
+POINT_RECORD = np.dtype(
+    [
+        ("number", ">i4"),
+        ("length", ">i4"),
+        ("shape_type", "<i4"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+    ]
+)
+# deletion flag of .dbf records
+DBF_DELETED = b"*"
+# records of shapefiles are parsed, and rows of TSVs written, in batches
+READ_BATCH_SIZE = 100_000
+WRITE_BATCH_SIZE = 10_000
 
 
 def process_active_fire_alerts(alert_type):
-    LOGGER.info(f"Retrieving fire alerts for {alert_type}")
-    response = requests.get(ACTIVE_FIRE_ALERTS_7D_SHAPEFILE_URLS[alert_type])
-
-    if response.status_code != 200:
-        raise Exception(
-            f"Unable to get active {alert_type} fire alerts, FIRMS returned status code {response.status_code}"
-        )
-
-    LOGGER.info("Successfully downloaded alerts from NASA")
-
-    zip = zipfile.ZipFile(io.BytesIO(response.content))
-    shp_dir = f"{TEMP_DIR}/fire_alerts_{alert_type}"
-    zip.extractall(shp_dir)
-
-    if not os.path.isfile(f"{shp_dir}/{SHP_NAMES[alert_type]}"):
-        raise Exception(
-            f"{alert_type} fire alerts zip downloaded, but contains no .shp file!"
-        )
-
-    sf = shapefile.Reader(f"{shp_dir}/{SHP_NAMES[alert_type]}")
+    """
+    Write FIRMS alerts newer than the last saved alert to a new near real time
+    TSV, and return its URI and the date of its last alert. Returns None if
+    the feed hasn't changed since it was last processed, or has no new alerts.
+    """
+    nrt_s3_directory = get_nrt_s3_directory(alert_type)
+    last_saved_date, last_saved_min = _get_last_saved_alert_time(alert_type)
+    LOGGER.info(f"Last saved row datetime: {last_saved_date} {last_saved_min}")
 
-    rows = []
-    for shape_record in sf.iterShapeRecords():
-        row = shape_record.record.as_dict()
-        row["LATITUDE"] = shape_record.shape.points[0][1]
-        row["LONGITUDE"] = shape_record.shape.points[0][0]
-        row["ACQ_DATE"] = row["ACQ_DATE"].strftime("%Y-%m-%d")
-        rows.append(row)
+    window = get_feed_window(last_saved_date, last_saved_min)
+    url = ACTIVE_FIRE_ALERTS_SHAPEFILE_URLS[alert_type].format(window=window)
+    feed_states = _get_feed_states(alert_type)
 
-    sorted_rows = sorted(rows, key=lambda row: f"{row['ACQ_DATE']}_{row['ACQ_TIME']}")
+    LOGGER.info(f"Retrieving {window} fire alerts for {alert_type}")
+    download = _download(url, alert_type, feed_states.get(url, {}))
+    if download is None:
+        LOGGER.info(f"{alert_type} fire alerts unchanged since last sync, skipping")
+        return None
 
-    last_row = sorted_rows[-1]
+    zip_file, feed_states[url] = download
+    LOGGER.info("Successfully downloaded alerts from NASA")
 
     fields = [
         "latitude",
@@ -73,41 +100,64 @@ def process_active_fire_alerts(alert_type):
     fields += BRIGHTNESS_FIELDS[alert_type]
     fields.append("frp")
 
-    result_path = get_tmp_result_path(alert_type)
-
-    tsv_file = open(result_path, "w", newline="")
-    tsv_writer = csv.DictWriter(tsv_file, fieldnames=fields, delimiter="\t")
-    tsv_writer.writeheader()
+    shp_name = SHP_NAMES[alert_type].format(window=window)
+    with zipfile.ZipFile(zip_file) as archive:
+        if shp_name not in archive.namelist():
+            raise Exception(
+                f"{alert_type} fire alerts zip downloaded, but contains no .shp file!"
+            )
+
+        # only parse the columns written to the TSV, coordinates come from the
+        # points. Members are read straight from the zip, without extracting them.
+        dbf_name = f"{shp_name[:-4]}.dbf"
+        with archive.open(shp_name) as shp, archive.open(dbf_name) as dbf:
+            longitudes, latitudes = _read_points(shp)
+            columns, active = _read_dbf_columns(
+                dbf, [field.upper() for field in fields if field not in POINT_FIELDS]
+            )
+
+    if len(active) != len(longitudes):
+        raise ValueError(
+            f"{alert_type} fire alerts shapefile has {len(longitudes)} points, "
+            f"but {len(active)} records"
+        )
+    # deleted records are left out of the columns, and so are their points
+    columns["LATITUDE"] = latitudes[active]
+    columns["LONGITUDE"] = longitudes[active]
+
+    dates: np.ndarray = columns["ACQ_DATE"]
+    times: np.ndarray = columns["ACQ_TIME"]
+    datetimes: np.ndarray = np.char.add(np.char.add(dates, b"_"), times)
+
+    # only keep alerts past the overlap with the last dataset, before sorting them
+    new_rows: np.ndarray = np.flatnonzero(
+        (dates > last_saved_date.encode())
+        | ((dates == last_saved_date.encode()) & (times > last_saved_min.encode()))
+    )
+    if len(new_rows) == 0:
+        LOGGER.info(f"No {alert_type} fire alerts since last sync, skipping")
+        _put_feed_states(alert_type, feed_states)
+        return None
+
+    new_rows = new_rows[np.argsort(datetimes[new_rows], kind="stable")]
+
+    first_date, first_time = dates[new_rows[0]].decode(), times[new_rows[0]].decode()
+    last_date, last_time = dates[new_rows[-1]].decode(), times[new_rows[-1]].decode()
+    LOGGER.info(f"First row datetime: {first_date} {first_time}")
+
+    # for VIIRS, we only want first letter of confidence category, to make NRT category same as scientific
+    if alert_type == "viirs":
+        columns["CONFIDENCE"] = columns["CONFIDENCE"].astype("S1")
 
-    nrt_s3_directory = f"nasa_{alert_type.lower()}_fire_alerts/{VERSIONS[alert_type]}/vector/epsg-4326/tsv/near_real_time"
-    last_saved_date, last_saved_min = _get_last_saved_alert_time(nrt_s3_directory)
-    LOGGER.info(f"Last saved row datetime: {last_saved_date} {last_saved_min}")
+    result_path = get_tmp_result_path(alert_type)
+    with open(result_path, "w", newline="") as tsv_file:
+        _write_rows(tsv_file, columns, fields, new_rows)
 
-    first_row = None
-    for row in sorted_rows:
-        # only start once we confirm we're past the overlap with the last dataset
-        if row["ACQ_DATE"] > last_saved_date or (
-            row["ACQ_DATE"] == last_saved_date and row["ACQ_TIME"] > last_saved_min
-        ):
-            if not first_row:
-                first_row = row
-                LOGGER.info(
-                    f"First row datetime: {first_row['ACQ_DATE']} {first_row['ACQ_TIME']}"
-                )
-
-            # for VIIRS, we only want first letter of confidence category, to make NRT category same as scientific
-            if alert_type == "viirs":
-                row["CONFIDENCE"] = row["CONFIDENCE"][0]
-
-            _write_row(row, fields, tsv_writer)
-
-    LOGGER.info(f"Last row datetime: {last_row['ACQ_DATE']} {last_row['ACQ_TIME']}")
+    LOGGER.info(f"Last row datetime: {last_date} {last_time}")
     LOGGER.info("Successfully wrote TSV")
 
-    tsv_file.close()
-
     # upload both files to s3
-    file_name = f"{first_row['ACQ_DATE']}-{first_row['ACQ_TIME']}_{last_row['ACQ_DATE']}-{last_row['ACQ_TIME']}.tsv"
+    file_name = f"{first_date}-{first_time}_{last_date}-{last_time}.tsv"
 
     with open(result_path, "rb") as tsv_result:
         pipeline_key = f"{nrt_s3_directory}/{file_name}"
@@ -117,40 +167,341 @@ def process_active_fire_alerts(alert_type):
 
     LOGGER.info(f"Successfully uploaded to s3://{DATA_LAKE_BUCKET}/{pipeline_key}")
 
-    # remove raw shapefile, since it can be big and hit max lambda storage size of 512 MB
-    shutil.rmtree(shp_dir)
+    # only skip the feed next time once its alerts are saved
+    _put_watermark(alert_type, pipeline_key)
+    _put_feed_states(alert_type, feed_states)
+
+    return (f"s3a://{DATA_LAKE_BUCKET}/{pipeline_key}", last_date)
+
+
+def get_feed_window(
+    last_saved_date: str, last_saved_min: str, now: Optional[datetime] = None
+) -> str:
+    """
+    Smallest FIRMS feed window covering the time since the last saved alert
+    """
+    if last_saved_date == "0000-00-00":
+        return "7d"
+
+    last_saved = datetime.strptime(
+        f"{last_saved_date} {last_saved_min}", "%Y-%m-%d %H%M"
+    ).replace(tzinfo=timezone.utc)
+    gap = (now or datetime.now(timezone.utc)) - last_saved + FEED_WINDOW_MARGIN
+
+    for window, span in FEED_WINDOWS.items():
+        if gap <= span:
+            return window
+
+    LOGGER.warning(
+        f"Last saved alert at {last_saved} is older than the largest FIRMS window"
+    )
+    return "7d"
+
+
+def _download(
+    url: str, alert_type: str, feed_state: Dict[str, str]
+) -> Optional[Tuple[IO[bytes], Dict[str, str]]]:
+    """
+    Stream the zip into memory, unless it's unchanged since the ETag and
+    Last-Modified headers in the feed state. Returns the zip with the new feed
+    state, or None if unchanged.
+
+    Zip members are located through the central directory at the end of the
+    file, so it has to be fully downloaded before opening any of them.
+    """
+    headers: Dict[str, str] = dict()
+    if "etag" in feed_state:
+        headers["If-None-Match"] = feed_state["etag"]
+    if "last_modified" in feed_state:
+        headers["If-Modified-Since"] = feed_state["last_modified"]
+
+    with requests.get(url, headers=headers, stream=True) as response:
+        if response.status_code == 304:
+            return None
+        elif response.status_code != 200:
+            raise Exception(
+                f"Unable to get active {alert_type} fire alerts, FIRMS returned status code {response.status_code}"
+            )
+
+        new_state: Dict[str, str] = dict()
+        if "ETag" in response.headers:
+            new_state["etag"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            new_state["last_modified"] = response.headers["Last-Modified"]
+
+        # in case the server ignores conditional requests
+        if "etag" in new_state and new_state["etag"] == feed_state.get("etag"):
+            return None
+
+        zip_file = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            zip_file.write(chunk)
+
+    zip_file.seek(0)
+    return zip_file, new_state
+
+
+def _get_feed_states(alert_type: str) -> Dict[str, Dict[str, str]]:
+    """
+    ETag and Last-Modified headers of the last processed FIRMS feeds, by URL
+    """
+    try:
+        response = get_s3_client().get_object(
+            Bucket=GLOBALS.s3_bucket_pipeline, Key=_get_feed_states_key(alert_type)
+        )
+    except get_s3_client().exceptions.NoSuchKey:
+        return dict()
+
+    return json.loads(response["Body"].read())
+
 
-    return (f"s3a://{DATA_LAKE_BUCKET}/{pipeline_key}", last_row["ACQ_DATE"])
+def _put_feed_states(alert_type: str, feed_states: Dict[str, Dict[str, str]]) -> None:
+    get_s3_client().put_object(
+        Bucket=GLOBALS.s3_bucket_pipeline,
+        Key=_get_feed_states_key(alert_type),
+        Body=json.dumps(feed_states),
+    )
+
+
+def _get_feed_states_key(alert_type: str) -> str:
+    return f"fire_alerts/{alert_type.lower()}/feed_states.json"
 
 
 def get_tmp_result_path(alert_type):
     return f"{TEMP_DIR}/fire_alerts_{alert_type.lower()}.tsv"
 
 
-def _get_last_saved_alert_time(nrt_s3_directory):
-    paginator = get_s3_client().get_paginator("list_objects_v2")
-    page_iterator = paginator.paginate(Bucket=DATA_LAKE_BUCKET, Prefix=nrt_s3_directory)
-    latest_key = None
+def get_nrt_s3_directory(alert_type: str) -> str:
+    return f"nasa_{alert_type.lower()}_fire_alerts/{VERSIONS[alert_type]}/vector/epsg-4326/tsv/near_real_time"
 
-    for page in page_iterator:
-        if "Contents" in page:
-            latest_key_curr = max(page['Contents'], key=lambda x: x["Key"])["Key"]
-            if latest_key is None or latest_key_curr > latest_key:
-                latest_key = latest_key_curr
 
-    if latest_key:
-        last_min = latest_key[-8:-4]
-        last_date = latest_key[-19:-9]
+def _get_last_saved_alert_time(alert_type: str) -> Tuple[str, str]:
+    """
+    Date and time of the last saved alert, from the name of the latest near
+    real time file. The watermark saves listing the whole directory, files
+    past it are still picked up in case writing it failed.
+    """
+    watermark: Optional[str] = _get_watermark(alert_type)
+    latest_key: Optional[str] = _get_latest_nrt_key(alert_type, watermark)
 
-        return last_date, last_min
+    if latest_key is None:
+        latest_key = watermark
     else:
+        _put_watermark(alert_type, latest_key)
+
+    if latest_key is None:
         return "0000-00-00", "0000"
 
+    match = NRT_FILE_NAME.match(os.path.basename(latest_key))
+    if match is None:
+        raise ValueError(f"Watermark {latest_key} isn't a near real time file")
+
+    return match.group(3), match.group(4)
+
+
+def _get_latest_nrt_key(
+    alert_type: str, start_after: Optional[str] = None
+) -> Optional[str]:
+    """
+    Latest near real time file, only listing keys after the given one if set.
+    Subdirectories and files not named like near real time files are ignored.
+    """
+    kwargs: Dict[str, str] = {
+        "Bucket": DATA_LAKE_BUCKET,
+        "Prefix": f"{get_nrt_s3_directory(alert_type)}/",
+        "Delimiter": "/",
+    }
+    if start_after is not None:
+        kwargs["StartAfter"] = start_after
+
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    latest_key: Optional[str] = None
+
+    for page in paginator.paginate(**kwargs):
+        for obj in page.get("Contents", []):
+            if NRT_FILE_NAME.match(os.path.basename(obj["Key"])) and (
+                latest_key is None or obj["Key"] > latest_key
+            ):
+                latest_key = obj["Key"]
+
+    return latest_key
+
+
+def _get_watermark(alert_type: str) -> Optional[str]:
+    """
+    Key of the latest near real time file as of the last sync
+    """
+    try:
+        response = get_s3_client().get_object(
+            Bucket=GLOBALS.s3_bucket_pipeline, Key=_get_watermark_key(alert_type)
+        )
+    except get_s3_client().exceptions.NoSuchKey:
+        return None
+
+    return json.loads(response["Body"].read())["key"]
+
+
+def _put_watermark(alert_type: str, key: str) -> None:
+    get_s3_client().put_object(
+        Bucket=GLOBALS.s3_bucket_pipeline,
+        Key=_get_watermark_key(alert_type),
+        Body=json.dumps({"key": key}),
+    )
+
+
+def _get_watermark_key(alert_type: str) -> str:
+    return f"fire_alerts/{alert_type.lower()}/watermark.json"
+
+
+def _write_rows(
+    tsv_file: IO[str],
+    columns: Dict[str, np.ndarray],
+    fields: List[str],
+    rows: np.ndarray,
+) -> None:
+    """
+    Write the given rows of the columns as TSV, a batch of rows at a time.
+    Fields without a column are left empty.
+    """
+    tsv_writer = csv.writer(tsv_file, delimiter="\t")
+    tsv_writer.writerow(fields)
+
+    for i in range(0, len(rows), WRITE_BATCH_SIZE):
+        batch: np.ndarray = rows[i : i + WRITE_BATCH_SIZE]
+        tsv_writer.writerows(
+            zip(*[_get_values(columns.get(field.upper()), batch) for field in fields])
+        )
+
+
+def _get_values(column: Optional[np.ndarray], rows: np.ndarray) -> List[Any]:
+    if column is None:
+        return [""] * len(rows)
+    elif column.dtype.kind == "S":
+        return np.char.decode(column[rows], "utf-8").tolist()
+    else:
+        return column[rows].tolist()
+
+
+def _read_points(shp: IO[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read the coordinates of a point shapefile into x and y arrays
+    """
+    header: bytes = shp.read(100)
+    (file_length,) = struct.unpack(">24xi72x", header)
+    record_count, remainder = divmod(file_length * 2 - 100, POINT_RECORD.itemsize)
+    if remainder:
+        raise ValueError("Shapefile doesn't only contain points")
+
+    xs: List[np.ndarray] = []
+    ys: List[np.ndarray] = []
+    for i in range(0, record_count, READ_BATCH_SIZE):
+        count: int = min(READ_BATCH_SIZE, record_count - i)
+        records: np.ndarray = np.frombuffer(
+            _read_exactly(shp, count * POINT_RECORD.itemsize), dtype=POINT_RECORD
+        )
+        if np.any(records["shape_type"] != POINT_SHAPE_TYPE):
+            raise ValueError("Shapefile doesn't only contain points")
+
+        xs.append(records["x"].copy())
+        ys.append(records["y"].copy())
+
+    return _concatenate(xs), _concatenate(ys)
+
+
+def _read_dbf_columns(
+    dbf: IO[bytes], names: List[str]
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Read the named columns of a .dbf file into arrays, a batch of records at a
+    time. Numbers are parsed the same way pyshp does, dates are formatted as
+    YYYY-MM-DD and text is kept as stripped bytes. Columns not in the file are
+    left out.
+
+    Records flagged as deleted are skipped. Returns the columns with a mask of
+    the records kept, to filter the matching shapes the same way.
+    """
+    record_count, header_length, record_length = struct.unpack(
+        "<4xLHH20x", dbf.read(32)
+    )
+
+    fields: List[Tuple[str, str, int, int]] = []
+    for _ in range((header_length - 33) // 32):
+        name, field_type, size, decimals = struct.unpack("<11sc4xBB14x", dbf.read(32))
+        fields.append(
+            (name.split(b"\0")[0].decode().strip(), field_type.decode(), size, decimals)
+        )
+    dbf.read(header_length - 32 * (len(fields) + 1))
+
+    # records start with a deletion flag, followed by fixed width fields
+    record_dtype = np.dtype(
+        {
+            "names": ["deleted"] + [f"field_{i}" for i in range(len(fields))],
+            "formats": ["S1"] + [f"S{size}" for _, _, size, _ in fields],
+            "itemsize": record_length,
+        }
+    )
+    wanted = [(i, field) for i, field in enumerate(fields) if field[0] in names]
+
+    batches: Dict[str, List[np.ndarray]] = {field[0]: [] for _, field in wanted}
+    active: List[np.ndarray] = []
+    for i in range(0, record_count, READ_BATCH_SIZE):
+        count: int = min(READ_BATCH_SIZE, record_count - i)
+        records: np.ndarray = np.frombuffer(
+            _read_exactly(dbf, count * record_length), dtype=record_dtype
+        )
+
+        active.append(records["deleted"] != DBF_DELETED)
+        if not active[-1].all():
+            records = records[active[-1]]
+
+        for j, (name, field_type, _, decimals) in wanted:
+            batches[name].append(
+                _parse_dbf_values(records[f"field_{j}"], field_type, decimals)
+            )
+
+    columns = {name: _concatenate(parts) for name, parts in batches.items()}
+    return columns, np.concatenate(active) if active else np.zeros(0, dtype=bool)
+
+
+def _parse_dbf_values(values: np.ndarray, field_type: str, decimals: int) -> np.ndarray:
+    if field_type in ("N", "F"):
+        try:
+            return values.astype(np.float64 if decimals else np.int64)
+        except ValueError:
+            # empty or malformed numbers
+            return np.array([_parse_number(v, decimals) for v in values], dtype=object)
+    elif field_type == "D":
+        digits: np.ndarray = values.astype("S8").view(np.uint8).reshape(-1, 8)
+        if not np.all((digits >= ord("0")) & (digits <= ord("9"))):
+            raise ValueError("Dates in .dbf file aren't all formatted as YYYYMMDD")
+
+        dates: np.ndarray = np.full((len(values), 10), ord("-"), dtype=np.uint8)
+        dates[:, 0:4] = digits[:, 0:4]
+        dates[:, 5:7] = digits[:, 4:6]
+        dates[:, 8:10] = digits[:, 6:8]
+        return dates.view("S10").ravel()
+    else:
+        return np.char.strip(values)
+
+
+def _parse_number(value: bytes, decimals: int) -> Optional[Union[float, int]]:
+    value = value.split(b"\0")[0].replace(b"*", b"")
+    try:
+        return float(value) if decimals else int(value)
+    except ValueError:
+        try:
+            return None if decimals else int(float(value))
+        except ValueError:
+            return None
+
+
+def _read_exactly(f: IO[bytes], size: int) -> bytes:
+    data: bytes = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"Expected {size} bytes, but file ended after {len(data)}")
+
+    return data
 
-def _write_row(row, fields, writer):
-    tsv_row = dict()
-    for field in fields:
-        if field.upper() in row:
-            tsv_row[field] = row[field.upper()]
 
-    writer.writerow(tsv_row)
+def _concatenate(arrays: List[np.ndarray]) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.array([])
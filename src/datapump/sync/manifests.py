@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Set
+
+from ..clients.aws import get_s3_client, get_s3_path_parts
+from ..globals import LOGGER
+from ..util.writers import open_writer
+
+
+def get_manifest_uri(aoi_src: str) -> str:
+    """
+    URI of the geostore ID manifest of a feature file. Manifests are kept in a
+    subfolder so they never match the feature file wildcards.
+    """
+    folder, name = aoi_src.rsplit("/", 1)
+    return f"{folder}/manifests/{os.path.splitext(name)[0]}.ids.gz"
+
+
+def get_aliases_uri(aoi_src: str) -> str:
+    """
+    URI of the duplicate geostore IDs of a feature file, next to its manifest
+    """
+    folder, name = aoi_src.rsplit("/", 1)
+    return f"{folder}/manifests/{os.path.splitext(name)[0]}.aliases.json"
+
+
+def get_tsv_copy_uri(aoi_src: str) -> str:
+    """
+    URI of the TSV copy of a Parquet feature file. Full analyses only read TSV
+    feature files, so one is written next to each Parquet feature file.
+    """
+    return f"{os.path.splitext(aoi_src)[0]}.tsv"
+
+
+def get_sidecar_uris(aoi_src: str) -> List[str]:
+    uris: List[str] = [get_manifest_uri(aoi_src), get_aliases_uri(aoi_src)]
+    if aoi_src.endswith(".parquet"):
+        uris.append(get_tsv_copy_uri(aoi_src))
+
+    return uris
+
+
+def write_manifest(
+    aoi_src: str,
+    geostore_ids: List[str],
+    aliases: Optional[Dict[str, List[str]]] = None,
+) -> None:
+    """
+    Write gzipped, newline delimited geostore IDs of a feature file next to it,
+    including the IDs of duplicates. Duplicates are also written to a separate
+    JSON file, mapping IDs of the geostores in the feature file to their aliases.
+    """
+    with open_writer(get_manifest_uri(aoi_src)) as manifest:
+        manifest.write(gzip.compress("\n".join(geostore_ids).encode("utf-8")))
+
+    if aliases:
+        with open_writer(get_aliases_uri(aoi_src)) as aliases_json:
+            aliases_json.write(json.dumps(aliases))
+
+
+def get_geostore_aliases(aoi_src: str) -> Dict[str, List[str]]:
+    """
+    Get duplicate geostore IDs of a feature file, keyed by the ID of the
+    geostore in the feature file. Aliases of every feature file matching a
+    wildcard, like the one full analyses read, are merged.
+    """
+    if "*" not in aoi_src:
+        return _read_geostore_aliases(get_aliases_uri(aoi_src))
+
+    aliases: Dict[str, List[str]] = dict()
+    for aliases_uri in _list_aliases_uris(aoi_src):
+        for geostore_id, duplicates in _read_geostore_aliases(aliases_uri).items():
+            merged: List[str] = aliases.setdefault(geostore_id, [])
+            merged += [gid for gid in duplicates if gid not in merged]
+
+    return aliases
+
+
+def _list_aliases_uris(aoi_src: str) -> List[str]:
+    folder: str = aoi_src.rsplit("/", 1)[0]
+    pattern: str = get_aliases_uri(aoi_src).rsplit("/", 1)[1]
+    bucket, prefix = get_s3_path_parts(f"{folder}/manifests/")
+
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    return [
+        f"s3://{bucket}/{obj['Key']}"
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/")
+        for obj in page.get("Contents", [])
+        if fnmatch(os.path.basename(obj["Key"]), pattern)
+    ]
+
+
+def _read_geostore_aliases(aliases_uri: str) -> Dict[str, List[str]]:
+    bucket, key = get_s3_path_parts(aliases_uri)
+
+    try:
+        response = get_s3_client().get_object(Bucket=bucket, Key=key)
+    except get_s3_client().exceptions.NoSuchKey:
+        return dict()
+
+    return json.loads(response["Body"].read())
+
+
+def expand_geostore_aliases(result_uri: str, aliases: Dict[str, List[str]]) -> None:
+    """
+    Rewrite an analysis result file, copying each row of a deduplicated geostore
+    for each of its aliases. Rows of aliases already in the file are dropped
+    first, so results can be expanded more than once.
+    """
+    bucket, key = get_s3_path_parts(result_uri)
+    lines = get_s3_client().get_object(Bucket=bucket, Key=key)["Body"].iter_lines()
+
+    header: Optional[bytes] = next(lines, None)
+    if header is None:
+        return
+
+    columns: List[bytes] = header.split(b"\t")
+    if b"geostore__id" not in columns:
+        return
+
+    col: int = columns.index(b"geostore__id")
+    duplicates: Set[bytes] = {
+        gid.encode("utf-8") for gids in aliases.values() for gid in gids
+    }
+    encoded_aliases: Dict[bytes, List[bytes]] = {
+        rep.encode("utf-8"): [gid.encode("utf-8") for gid in gids]
+        for rep, gids in aliases.items()
+    }
+
+    LOGGER.info(f"Expanding geostore aliases in {result_uri}")
+    with open_writer(result_uri) as result:
+        result.write(header + b"\n")
+
+        for line in lines:
+            fields: List[bytes] = line.split(b"\t")
+            if fields[col] in duplicates:
+                continue
+
+            result.write(line + b"\n")
+            for alias in encoded_aliases.get(fields[col], []):
+                fields[col] = alias
+                result.write(b"\t".join(fields) + b"\n")
+
+
+def get_aoi_geostore_ids(aoi_src: str) -> Set[str]:
+    """
+    Get geostore IDs of a feature file from its manifest. Feature files written
+    before manifests existed are streamed line by line instead.
+    """
+    manifest_bucket, manifest_key = get_s3_path_parts(get_manifest_uri(aoi_src))
+
+    try:
+        response = get_s3_client().get_object(Bucket=manifest_bucket, Key=manifest_key)
+    except get_s3_client().exceptions.NoSuchKey:
+        LOGGER.info(f"No geostore ID manifest found for {aoi_src}, reading TSV")
+        return _read_aoi_geostore_ids(aoi_src)
+
+    manifest: str = gzip.decompress(response["Body"].read()).decode("utf-8")
+    return {geostore_id for geostore_id in manifest.split("\n") if geostore_id}
+
+
+def _read_aoi_geostore_ids(aoi_src: str) -> Set[str]:
+    geostore_ids = set()
+    aoi_bucket, aoi_key = get_s3_path_parts(aoi_src)
+
+    body = get_s3_client().get_object(Bucket=aoi_bucket, Key=aoi_key)["Body"]
+    lines = body.iter_lines()
+
+    # skip header
+    next(lines, None)
+    for line in lines:
+        geostore_id = line.split(b"\t", 1)[0].decode("utf-8")
+        if geostore_id:
+            geostore_ids.add(geostore_id)
+
+    return geostore_ids
@@ -0,0 +1,230 @@
+import json
+import os
+from itertools import groupby
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from ..clients.aws import get_emr_client, get_s3_client
+from ..globals import LOGGER
+from ..util.util import Deadline
+from ..util.writers import open_writer
+from .fire_alerts import DATA_LAKE_BUCKET, NRT_FILE_NAME, get_nrt_s3_directory
+
+MANIFEST_DIR = "_manifests"
+
+# states of EMR clusters that may still read near real time files
+ACTIVE_CLUSTER_STATES = ["STARTING", "BOOTSTRAPPING", "RUNNING", "WAITING"]
+
+# length of the alert date prefix that identifies each compaction period
+PERIOD_LENGTHS = {"day": len("YYYY-MM-DD"), "month": len("YYYY-MM")}
+
+
+class NRTFile(NamedTuple):
+    key: str
+    # date and time of the first and last alerts, as YYYY-MM-DD-HHMM
+    first: str
+    last: str
+
+
+def compact_nrt_alerts(
+    alert_type: str, period: str, deadline: Optional[Deadline] = None
+) -> List[str]:
+    """
+    Merge the near real time files of each complete day or month into a single
+    file, named after its first and last alerts like any other. The period of
+    the latest file is never compacted, so the last saved alert time and the
+    files syncs append after it don't change.
+
+    Each merge writes a manifest of the files it merges, then the merged file,
+    and only then deletes them, so alerts are never missing. Merges left
+    unfinished are completed on the next run. Fire analyses read every near
+    real time file, so nothing is compacted while one is running. Returns the
+    keys of new files.
+    """
+    if _fire_analysis_running(alert_type):
+        LOGGER.info(f"{alert_type} analysis running, skipping compaction")
+        return []
+
+    directory: str = get_nrt_s3_directory(alert_type)
+    files: List[NRTFile] = _finish_compactions(directory, _list_nrt_files(directory))
+    if not files:
+        return []
+
+    period_length: int = PERIOD_LENGTHS[period]
+    latest_period: str = files[-1].first[:period_length]
+    complete: List[NRTFile] = [
+        f for f in files if f.first[:period_length] < latest_period
+    ]
+
+    compacted: List[str] = []
+    for _, group in groupby(complete, key=lambda f: f.first[:period_length]):
+        sources: List[NRTFile] = list(group)
+        if len(sources) < 2:
+            continue
+
+        if deadline is not None and deadline.expired():
+            LOGGER.info(f"Compacting {alert_type} alerts hit the deadline, stopping")
+            break
+
+        compacted.append(_compact(directory, sources))
+
+    LOGGER.info(f"Compacted {alert_type} alerts into {len(compacted)} files")
+    return compacted
+
+
+def _list_nrt_files(directory: str) -> List[NRTFile]:
+    """
+    Near real time files sorted by key, which sorts them by first alert
+    """
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    files: List[NRTFile] = []
+
+    for page in paginator.paginate(
+        Bucket=DATA_LAKE_BUCKET, Prefix=f"{directory}/", Delimiter="/"
+    ):
+        for obj in page.get("Contents", []):
+            match = NRT_FILE_NAME.match(os.path.basename(obj["Key"]))
+            if match:
+                first_date, first_min, last_date, last_min = match.groups()
+                files.append(
+                    NRTFile(
+                        obj["Key"],
+                        f"{first_date}-{first_min}",
+                        f"{last_date}-{last_min}",
+                    )
+                )
+
+    return sorted(files)
+
+
+def _finish_compactions(directory: str, files: List[NRTFile]) -> List[NRTFile]:
+    """
+    Syncs only add files past the last saved alert, so merged files only
+    overlap their sources if a merge was interrupted before deleting them.
+    Delete the sources listed in the manifest of each overlapping file, and
+    return the files left. Overlaps no manifest explains, e.g. of backfilled
+    files, are left as they are.
+    """
+    clusters: List[List[NRTFile]] = []
+    cluster_last: str = ""
+    for f in files:
+        if clusters and f.first <= cluster_last:
+            clusters[-1].append(f)
+            cluster_last = max(cluster_last, f.last)
+        else:
+            clusters.append([f])
+            cluster_last = f.last
+
+    deleted: Set[str] = set()
+    for cluster in clusters:
+        if len(cluster) == 1:
+            continue
+
+        for merged in cluster:
+            manifest_sources: Set[str] = set(_get_manifest_sources(directory, merged))
+            sources: List[NRTFile] = [f for f in cluster if f.key in manifest_sources]
+            if sources:
+                LOGGER.info(f"Finishing compaction of {merged.key}")
+                _delete(sources)
+                deleted.update(f.key for f in sources)
+
+        if not deleted.intersection(f.key for f in cluster):
+            LOGGER.warning(
+                f"Near real time files {[f.key for f in cluster]} overlap, but "
+                "no compaction manifest lists them, leaving them as they are"
+            )
+
+    return [f for f in files if f.key not in deleted]
+
+
+def _compact(directory: str, sources: List[NRTFile]) -> str:
+    """
+    Merge the files into one, keeping only the header of the first
+    """
+    merged = NRTFile(
+        f"{directory}/{sources[0].first}_{max(f.last for f in sources)}.tsv",
+        sources[0].first,
+        max(f.last for f in sources),
+    )
+    # a source spanning all others has the key of the merged file, and is
+    # replaced by it instead of being deleted
+    replaced: List[NRTFile] = [f for f in sources if f.key != merged.key]
+
+    _put_manifest(directory, merged, replaced)
+
+    header: Optional[bytes] = None
+    with open_writer(f"s3://{DATA_LAKE_BUCKET}/{merged.key}") as writer:
+        for source in sources:
+            response = get_s3_client().get_object(
+                Bucket=DATA_LAKE_BUCKET, Key=source.key
+            )
+            content: bytes = response["Body"].read()
+            source_header, _, rows = content.partition(b"\n")
+
+            if header is None:
+                header = source_header
+                writer.write(content)
+            elif source_header != header:
+                raise ValueError(
+                    f"Header of {source.key} doesn't match the header of "
+                    f"{sources[0].key}, not compacting them"
+                )
+            else:
+                writer.write(rows)
+
+    _delete(replaced)
+
+    LOGGER.info(f"Compacted {len(sources)} files into {merged.key}")
+    return merged.key
+
+
+def _put_manifest(directory: str, merged: NRTFile, sources: List[NRTFile]) -> None:
+    get_s3_client().put_object(
+        Bucket=DATA_LAKE_BUCKET,
+        Key=_get_manifest_key(directory, merged),
+        Body=json.dumps(
+            {"key": merged.key, "sources": [source.key for source in sources]}
+        ),
+    )
+
+
+def _get_manifest_sources(directory: str, merged: NRTFile) -> List[str]:
+    """
+    Keys of the files merged into a file, or none if it isn't a merged file
+    """
+    try:
+        response = get_s3_client().get_object(
+            Bucket=DATA_LAKE_BUCKET, Key=_get_manifest_key(directory, merged)
+        )
+    except get_s3_client().exceptions.NoSuchKey:
+        return []
+
+    return json.loads(response["Body"].read())["sources"]
+
+
+def _get_manifest_key(directory: str, merged: NRTFile) -> str:
+    name: str = os.path.splitext(os.path.basename(merged.key))[0]
+    return f"{directory}/{MANIFEST_DIR}/{name}.json"
+
+
+def _delete(files: List[NRTFile]) -> None:
+    for f in files:
+        get_s3_client().delete_object(Bucket=DATA_LAKE_BUCKET, Key=f.key)
+
+
+def _fire_analysis_running(alert_type: str) -> bool:
+    """
+    Whether an EMR cluster of a Geotrellis analysis of the alert type is
+    starting or running
+    """
+    paginator = get_emr_client().get_paginator("list_clusters")
+    for page in paginator.paginate(ClusterStates=ACTIVE_CLUSTER_STATES):
+        for cluster in page["Clusters"]:
+            tags: List[Dict[str, str]] = (
+                get_emr_client()
+                .describe_cluster(ClusterId=cluster["Id"])["Cluster"]
+                .get("Tags", [])
+            )
+            if {"Key": "Analysis", "Value": alert_type} in tags:
+                return True
+
+    return False
@@ -1,47 +1,349 @@
 import io
 import json
+import math
 import os
+import time
 import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from hashlib import blake2b
+from itertools import groupby
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import parse_qs, urlparse
 
 import requests
 from requests import Response
-from shapely.geometry import MultiPolygon, Polygon, shape
+from retry import retry
+from shapely.geometry import shape
 from shapely.wkb import dumps
 
 from ..clients.aws import get_s3_client, get_s3_path, get_s3_path_parts
-from ..clients.rw_api import token, update_area_statuses
+from ..clients.rw_api import session, token, update_area_statuses
 from ..globals import GLOBALS, LOGGER
 from ..util.exceptions import EmptyResponseException, UnexpectedResponseError
 from ..util.slack import slack_webhook
-from ..util.util import api_prefix
+from ..util.util import Deadline, api_prefix
+from ..util.writers import ObjectWriter, ParquetWriter, TeeWriter, open_writer
+from .manifests import (
+    get_aoi_geostore_ids,
+    get_geostore_aliases,
+    get_sidecar_uris,
+    get_tsv_copy_uri,
+    write_manifest,
+)
+from .tile_cache import get_cache_tag, get_cached_tiles, put_cached_tiles
+from .tiling import (
+    TileGrid,
+    canonical_wkb,
+    normalize_polygon,
+    repair_geometry,
+    tile_geometry,
+)
 
 DIRNAME = os.path.dirname(__file__)
-GEOSTORE_PAGE_SIZE = 25
-
+EXTENT_1X1_KEY = "geotrellis/features/extent_1x1.geojson"
+TILING_STAGING_PREFIX = "geotrellis/features/geostore/staging"
+TSV_HEADER = "geostore_id\tgeom\ttcl\tglad\n"
+# parse TSV rows into the columns of GeoParquet feature files
+PARQUET_CONVERTERS = {
+    "geom": bytes.fromhex,
+    "tcl": lambda value: value == "True",
+    "glad": lambda value: value == "True",
+}
+TILE_CACHE_BATCH_SIZE = 200
+TEMP_DIR = "/tmp"
+
+# rows are written to in-memory buffers, or streamed to S3 by object writers
+TSVWriter = Union[IO[str], ObjectWriter]
+
+# indexed extent grids of warm Lambda containers, keyed by ETag of the extent file
+_EXTENT_1X1_CACHE: Dict[str, TileGrid] = dict()
+
+
+def create_1x1_tsv(
+    version: str, grid_size: Optional[float] = None, deadline: Optional[Deadline] = None
+) -> List[str]:
+    """
+    Write 1x1 TSVs of pending user areas, split into shards of at most
+    `rw_areas_shard_size` geostores so every shard can be analyzed by a job of
+    its own. Geometries are tiled with cells of grid_size degrees, which
+    defaults to `rw_areas_grid_size`. Returns URIs of the feature files written.
+
+    If a deadline is given, tiling stops before it expires and the feature file
+    of the current shard is saved with the geostores tiled so far. Geostores
+    that weren't tiled stay pending, and are picked up by the next run.
+    """
 
-def create_1x1_tsv(version: str) -> Optional[str]:
-    tsv = get_virtual_1x1_tsv()
+    shards: List[List[str]] = _get_pending_shards()
+    geostore_uris: List[str] = []
+    deadline_reached: bool = False
+    for i, shard in enumerate(shards):
+        if deadline is not None and deadline.expired():
+            LOGGER.warning(
+                f"Deadline reached, leaving {len(shards) - i} shards pending for the next run"
+            )
+            deadline_reached = True
+            break
 
-    if tsv:
-        LOGGER.info("Geostores processed, uploading and analyzing")
-        geostore_path = f"geotrellis/features/geostore/{version}.tsv"
-        get_s3_client().put_object(
-            Body=tsv,
-            Bucket=GLOBALS.s3_bucket_pipeline,
-            Key=geostore_path,
+        geostore_uri = get_s3_path(
+            GLOBALS.s3_bucket_pipeline, _get_shard_path(version, i, len(shards))
         )
-        return get_s3_path(GLOBALS.s3_bucket_pipeline, geostore_path)
+
+        # stream rows to S3 as they are produced, instead of holding the
+        # whole feature file in memory
+        manifest: List[str] = []
+        pending: List[Dict[str, Any]] = []
+        aliases = _get_aliases()
+        with open_feature_writer(geostore_uri) as tsv:
+            geom_count = get_virtual_1x1_tsv(
+                tsv, shard, manifest, aliases, grid_size, deadline, pending
+            )
+
+            if not geom_count:
+                tsv.abort()
+
+        if geom_count:
+            write_manifest(geostore_uri, manifest, aliases)
+            geostore_uris.append(geostore_uri)
+
+        if pending:
+            LOGGER.warning(
+                f"Deadline reached, leaving {len(pending)} geostores of shard {i} "
+                f"and {len(shards) - i - 1} more shards pending for the next run"
+            )
+            deadline_reached = True
+            break
+
+    if geostore_uris:
+        LOGGER.info("Geostores processed, uploaded and analyzing")
     else:
         LOGGER.info("No geostores to process")
-        return None
+        # once per run, shards without new areas are only logged
+        if shards and not deadline_reached:
+            slack_webhook("INFO", "No new user areas found. Doing nothing.")
+
+    return geostore_uris
+
+
+def stage_geostore_chunks(
+    version: str, grid_size: Optional[float] = None
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Distributed tiling mode. Fetch pending geostores and stage them in S3 in
+    chunks of `rw_areas_tiling_chunk_size`, to be tiled in parallel by the tiler
+    Lambda and merged into one feature file per shard.
+    Returns URIs of the feature files the chunks will be merged into, and the
+    chunks to tile.
+    """
+    shards: List[List[str]] = _get_pending_shards()
+    geostore_uris: List[str] = []
+    chunks: List[Dict[str, Any]] = []
+
+    for i, shard in enumerate(shards):
+        geostore_uri = get_s3_path(
+            GLOBALS.s3_bucket_pipeline, _get_shard_path(version, i, len(shards))
+        )
+
+        try:
+            geostore: Dict[str, Any] = filter_geostores(get_geostore(shard))
+        except Exception:
+            LOGGER.error(traceback.format_exc())
+            slack_webhook(
+                "ERROR", "Error processing new user areas. See logs for more info."
+            )
+            continue
+
+        # deduplicate across the whole shard, so only representatives are staged
+        aliases = _get_aliases()
+        if aliases is not None:
+            geostore["data"] = _dedup_geostores(geostore["data"], aliases)
+
+        chunk_size: int = GLOBALS.rw_areas_tiling_chunk_size
+        for j in range(0, len(geostore["data"]), chunk_size):
+            staging_path = f"{TILING_STAGING_PREFIX}/{version}/{i}/{j // chunk_size}"
+            chunk = {
+                "features_1x1": geostore_uri,
+                "geostores": get_s3_path(
+                    GLOBALS.s3_bucket_pipeline, f"{staging_path}.json"
+                ),
+                "output": get_s3_path(
+                    GLOBALS.s3_bucket_pipeline, f"{staging_path}.tsv"
+                ),
+                "grid_size": grid_size or GLOBALS.rw_areas_grid_size,
+            }
+
+            staged: Dict[str, Any] = {"data": geostore["data"][j : j + chunk_size]}
+            if aliases is not None:
+                staged["aliases"] = {
+                    g["geostoreId"]: aliases[g["geostoreId"]]
+                    for g in staged["data"]
+                    if g["geostoreId"] in aliases
+                }
+
+            get_s3_client().put_object(
+                Bucket=GLOBALS.s3_bucket_pipeline,
+                Key=f"{staging_path}.json",
+                Body=json.dumps(staged),
+            )
+            chunks.append(chunk)
+
+        if geostore["data"]:
+            geostore_uris.append(geostore_uri)
+
+    LOGGER.info(f"Staged {len(chunks)} geostore chunks for tiling")
+    if shards and not chunks:
+        slack_webhook("INFO", "No new user areas found. Doing nothing.")
+
+    return geostore_uris, chunks
 
 
-def get_virtual_1x1_tsv() -> Optional[bytes]:
+def tile_geostore_chunk(
+    chunk: Dict[str, Any], deadline: Optional[Deadline] = None
+) -> Dict[str, Any]:
     """
-    Main Lambda function
+    Tile a staged chunk of geostores into a partial TSV, and return the chunk
+    with the number of rows written. Failed chunks are reported and skipped,
+    leaving their areas pending for the next run.
+
+    If a deadline is given and tiling can't finish before it, the geostores
+    tiled so far are saved as a part of the partial TSV and the rest are saved
+    to a checkpoint. The returned chunk then references the checkpoint, and is
+    resumed by tiling it again.
+    """
+    checkpoint_uri: Optional[str] = chunk.get("checkpoint")
+    geostores_bucket, geostores_key = get_s3_path_parts(
+        checkpoint_uri or chunk["geostores"]
+    )
+    geostore: Dict[str, Any] = json.loads(
+        get_s3_client()
+        .get_object(Bucket=geostores_bucket, Key=geostores_key)["Body"]
+        .read()
+    )
+
+    parts: List[str] = chunk.get("parts", [])
+    part_uri: str = _get_part_uri(chunk["output"], len(parts))
+    if checkpoint_uri:
+        LOGGER.info(f"Resuming chunk from checkpoint {checkpoint_uri}")
+
+    manifest: List[str] = []
+    pending: List[Dict[str, Any]] = []
+    aliases: Optional[Dict[str, List[str]]] = geostore.pop("aliases", None)
+    staged_aliases: Dict[str, List[str]] = dict(aliases or {})
+    with open_writer(part_uri) as tsv:
+        geom_count = write_1x1_tsv(
+            tsv, geostore, manifest, aliases, chunk.get("grid_size"), deadline, pending
+        )
+
+        if not geom_count:
+            tsv.abort()
+
+    if geom_count:
+        write_manifest(part_uri, manifest, aliases)
+        parts = parts + [part_uri]
+
+    tiled_chunk: Dict[str, Any] = {
+        **chunk,
+        "parts": parts,
+        "count": chunk.get("count", 0) + geom_count,
+    }
+    tiled_chunk.pop("checkpoint", None)
+
+    if pending:
+        checkpoint: Dict[str, Any] = {"data": pending}
+        if aliases is not None:
+            checkpoint["aliases"] = {
+                g["geostoreId"]: staged_aliases[g["geostoreId"]]
+                for g in pending
+                if g["geostoreId"] in staged_aliases
+            }
+
+        tiled_chunk["checkpoint"] = get_checkpoint_uri(chunk)
+        bucket, key = get_s3_path_parts(tiled_chunk["checkpoint"])
+        get_s3_client().put_object(Bucket=bucket, Key=key, Body=json.dumps(checkpoint))
+        LOGGER.info(
+            f"Checkpointed {len(pending)} geostores to {tiled_chunk['checkpoint']}"
+        )
+
+    return tiled_chunk
+
+
+def get_checkpoint_uri(chunk: Dict[str, Any]) -> str:
+    return f"{os.path.splitext(chunk['geostores'])[0]}.checkpoint.json"
+
+
+def _get_part_uri(output: str, part: int) -> str:
+    """
+    URI of a part of a partial TSV, the first part is the partial TSV itself
+    """
+    if part == 0:
+        return output
+
+    root, extension = os.path.splitext(output)
+    return f"{root}.{part}{extension}"
+
+
+def merge_geostore_chunks(chunks: List[Dict[str, Any]]) -> List[str]:
+    """
+    Concatenate the partial TSVs of tiled chunks into the feature file of their
+    shard, in chunk order, and clean up the staged files.
+    Returns URIs of the feature files written.
+    """
+    shards: Dict[str, List[Dict[str, Any]]] = dict()
+    for chunk in chunks:
+        shards.setdefault(chunk["features_1x1"], []).append(chunk)
+
+    geostore_uris: List[str] = []
+    for geostore_uri, shard_chunks in shards.items():
+        tiled_chunks = [chunk for chunk in shard_chunks if chunk.get("count")]
+        if not tiled_chunks:
+            continue
+
+        manifest: List[str] = []
+        aliases: Dict[str, List[str]] = dict()
+        with open_feature_writer(geostore_uri) as tsv:
+            tsv.write(TSV_HEADER)
+
+            for chunk in tiled_chunks:
+                for part_uri in chunk.get("parts", [chunk["output"]]):
+                    bucket, key = get_s3_path_parts(part_uri)
+                    body = get_s3_client().get_object(Bucket=bucket, Key=key)["Body"]
+
+                    # skip header of partial TSV
+                    body.readline()
+                    for data in body.iter_chunks():
+                        tsv.write(data)
+
+                    manifest += get_aoi_geostore_ids(part_uri)
+                    aliases.update(get_geostore_aliases(part_uri))
+
+        write_manifest(geostore_uri, sorted(manifest), aliases)
+        geostore_uris.append(geostore_uri)
+        LOGGER.info(f"Merged {len(tiled_chunks)} chunks into {geostore_uri}")
+
+    for chunk in chunks:
+        staged_uris = [chunk["geostores"], get_checkpoint_uri(chunk)]
+        for part_uri in set(chunk.get("parts", [])) | {chunk["output"]}:
+            staged_uris += [part_uri] + get_sidecar_uris(part_uri)
+
+        for uri in staged_uris:
+            bucket, key = get_s3_path_parts(uri)
+            get_s3_client().delete_object(Bucket=bucket, Key=key)
+
+    # tiler workers only log chunks without new areas, the merge reports them once
+    if chunks and not geostore_uris:
+        slack_webhook("INFO", "No new user areas found. Doing nothing.")
+
+    return geostore_uris
+
+
+def _get_pending_shards() -> List[List[str]]:
+    """
+    Get IDs of geostores of pending areas, split into shards of at most
+    `rw_areas_shard_size` geostores
     """
 
     LOGGER.info("Check for pending areas")
@@ -49,29 +351,144 @@ def get_virtual_1x1_tsv() -> Optional[bytes]:
     try:
         areas: List[Any] = get_pending_areas()
         geostore_ids: List[str] = get_geostore_ids(areas)
-        if not geostore_ids:
-            raise EmptyResponseException
+    except Exception:
+        LOGGER.error(traceback.format_exc())
+        slack_webhook(
+            "ERROR", "Error processing new user areas. See logs for more info."
+        )
+        return []
+
+    if not geostore_ids:
+        slack_webhook("INFO", "No new user areas found. Doing nothing.")
+        return []
+
+    shard_size: int = GLOBALS.rw_areas_shard_size
+    shards: List[List[str]] = [
+        geostore_ids[i : i + shard_size]
+        for i in range(0, len(geostore_ids), shard_size)
+    ]
+    LOGGER.info(f"Processing {len(geostore_ids)} geostores in {len(shards)} shards")
+
+    return shards
+
+
+def _get_shard_path(version: str, shard: int, shard_count: int) -> str:
+    extension: str = GLOBALS.rw_areas_feature_format
+    if shard_count == 1:
+        return f"geotrellis/features/geostore/{version}.{extension}"
+    else:
+        return f"geotrellis/features/geostore/{version}_{shard}.{extension}"
+
+
+def open_feature_writer(uri: str) -> ObjectWriter:
+    """
+    Open a writer for a feature file. Feature files ending in .parquet are
+    converted from the TSV rows written to them to GeoParquet, with WKB bytes
+    in the geom column and boolean tcl/glad columns. The TSV rows are also
+    written to a copy next to them, for full analyses.
+    """
+    if uri.endswith(".parquet"):
+        return TeeWriter(
+            [
+                ParquetWriter(uri, _get_parquet_schema(), PARQUET_CONVERTERS),
+                open_writer(get_tsv_copy_uri(uri)),
+            ]
+        )
+    else:
+        return open_writer(uri)
+
+
+def _get_parquet_schema():
+    import pyarrow as pa
+
+    geo_metadata = {
+        "version": "1.0.0",
+        "primary_column": "geom",
+        "columns": {
+            "geom": {
+                "encoding": "WKB",
+                "geometry_types": ["Polygon", "MultiPolygon"],
+            }
+        },
+    }
+
+    return pa.schema(
+        [
+            ("geostore_id", pa.string()),
+            ("geom", pa.binary()),
+            ("tcl", pa.bool_()),
+            ("glad", pa.bool_()),
+        ],
+        metadata={"geo": json.dumps(geo_metadata)},
+    )
+
+
+def get_virtual_1x1_tsv(
+    tsv: TSVWriter,
+    geostore_ids: List[str],
+    manifest: Optional[List[str]] = None,
+    aliases: Optional[Dict[str, List[str]]] = None,
+    grid_size: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    pending: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """
+    Writes the 1x1 TSV of the given pending geostores to tsv and returns the
+    number of rows written, or 0 if there was nothing to process. IDs of the
+    geostores written are appended to manifest, if given.
+    """
 
+    try:
         geostore: Dict[str, Any] = get_geostore(geostore_ids)
         geostore = filter_geostores(geostore)
+    except Exception:
+        LOGGER.error(traceback.format_exc())
+        slack_webhook(
+            "ERROR", "Error processing new user areas. See logs for more info."
+        )
+        return 0
 
+    return write_1x1_tsv(tsv, geostore, manifest, aliases, grid_size, deadline, pending)
+
+
+def write_1x1_tsv(
+    tsv: TSVWriter,
+    geostore: Dict[str, Any],
+    manifest: Optional[List[str]] = None,
+    aliases: Optional[Dict[str, List[str]]] = None,
+    grid_size: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    pending: Optional[List[Dict[str, Any]]] = None,
+) -> int:
+    """
+    Writes the 1x1 TSV of fetched geostores to tsv and returns the number of
+    rows written, or 0 if there was nothing to process. IDs of the geostores
+    written are appended to manifest, and duplicates to aliases, if given.
+    Geostores left untiled when the deadline approaches are appended to pending.
+    """
+
+    try:
         if not geostore:
             raise EmptyResponseException
 
-        with geostore_to_wkb(geostore) as (wkb, geom_count):
+        tiles = geostore_to_wkb(
+            geostore, tsv, manifest, aliases, grid_size, deadline, pending
+        )
+        with tiles as (wkb, geom_count):
             if geom_count == 0:
                 raise EmptyResponseException
 
-            return str.encode(wkb.getvalue())
+            return geom_count
     except EmptyResponseException:
-        slack_webhook("INFO", "No new user areas found. Doing nothing.")
-        return None
+        # reported once per run by the caller, not for every shard or chunk
+        LOGGER.info("No new user areas to tile")
+        return 0
     except Exception:
         LOGGER.error(traceback.format_exc())
         slack_webhook(
             "ERROR", "Error processing new user areas. See logs for more info."
         )
-        return None
+        return 0
 
 
 def get_pending_areas() -> List[Any]:
@@ -94,28 +511,46 @@ def get_pending_areas() -> List[Any]:
             f"v2/area/sync API failed with status code {sync_resp.status_code}, can't process areas"
         )
 
-    pending_areas: List[Any] = []
-    has_next_page = True
-    page_size = GEOSTORE_PAGE_SIZE
-    page_number = 1
-
-    while has_next_page:
-        url: str = f"http://{api_prefix()}-api.globalforestwatch.org/v2/area?status=pending&all=true&page[number]={page_number}&page[size]={page_size}"
-        r: Response = requests.get(url, headers=headers)
+    page_size: int = GLOBALS.rw_areas_page_size
 
-        if r.status_code != 200:
-            raise UnexpectedResponseError(
-                f"Get areas returned response {r.status_code} on page number {page_number}"
-            )
+    # the first page tells us how many pages there are, the remaining pages
+    # are fetched concurrently and concatenated in page order
+    first_page: Dict[str, Any] = _get_areas_page(1, page_size)
+    last_page_number: int = _get_page_number(first_page["links"]["last"])
 
-        page_areas = r.json()
-        page_number += 1
-        pending_areas += page_areas["data"]
-        has_next_page = page_areas["links"]["self"] != page_areas["links"]["last"]
+    with ThreadPoolExecutor(max_workers=GLOBALS.rw_api_max_workers) as executor:
+        pages = executor.map(
+            lambda page_number: _get_areas_page(page_number, page_size),
+            range(2, last_page_number + 1),
+        )
+        pending_areas: List[Any] = first_page["data"] + [
+            area for page in pages for area in page["data"]
+        ]
 
     return pending_areas
 
 
+def _get_areas_page(page_number: int, page_size: int) -> Dict[str, Any]:
+    headers: Dict[str, str] = {"Authorization": f"Bearer {token()}"}
+    url: str = f"http://{api_prefix()}-api.globalforestwatch.org/v2/area?status=pending&all=true&page[number]={page_number}&page[size]={page_size}"
+    r: Response = session().get(url, headers=headers)
+
+    if r.status_code != 200:
+        raise UnexpectedResponseError(
+            f"Get areas returned response {r.status_code} on page number {page_number}"
+        )
+
+    return r.json()
+
+
+def _get_page_number(link: str) -> int:
+    """
+    Get page number from a pagination link of the RW API
+    """
+    query: Dict[str, List[str]] = parse_qs(urlparse(link).query)
+    return int(query.get("page[number]", ["1"])[0])
+
+
 def get_geostore_ids(areas: List[Any]) -> List[str]:
     """
     Extract Geostore ID from user area
@@ -146,45 +581,60 @@ def get_geostore_ids(areas: List[Any]) -> List[str]:
         LOGGER.info(f"Setting invalid geostore IDs to error: {error_ids}")
         update_area_statuses(error_ids, "error")
 
-    # only return unique geostore ids
-    # Return max 2000 at a time, otherwise the lambda might time out
-    remaining_ids: List[Any] = list(set(geostore_ids) - {None})[:1500]
+    # only return unique geostore ids, sorted so shards of
+    # `rw_areas_shard_size` IDs are stable between runs
+    remaining_ids: List[Any] = sorted(set(geostore_ids) - {None})
     return remaining_ids
 
 
-def get_geostore(geostore_ids: List[str]) -> Dict[str, Any]:
+def get_geostore(
+    geostore_ids: List[str], block_size: Optional[int] = None
+) -> Dict[str, Any]:
     """
-    Get Geostore Geometry using list of geostore IDs
+    Get Geostore Geometry using list of geostore IDs. Blocks of IDs are
+    fetched concurrently, and geostores are returned in the order of the IDs.
     """
 
     LOGGER.info("Get Geostore Geometries by IDs")
 
+    block_size = block_size or GLOBALS.geostore_block_size
+    blocks: List[List[str]] = [
+        geostore_ids[i : i + block_size]
+        for i in range(0, len(geostore_ids), block_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=GLOBALS.rw_api_max_workers) as executor:
+        results = executor.map(_get_geostore_block, blocks, range(len(blocks)))
+        geostores: Dict[str, Any] = {"data": [g for block in results for g in block]}
+
+    return geostores
+
+
+@retry(
+    (UnexpectedResponseError, requests.exceptions.RequestException),
+    tries=3,
+    delay=1,
+    backoff=2,
+    jitter=(0, 1),
+)
+def _get_geostore_block(geostore_ids: List[str], block: int) -> List[Any]:
     headers: Dict[str, str] = {"Authorization": f"Bearer {token()}"}
     url: str = (
         f"https://{api_prefix()}-api.globalforestwatch.org/v2/geostore/find-by-ids"
     )
-    geostores: Dict[str, Any] = {"data": []}
-
-    for i in range(0, len(geostore_ids), GEOSTORE_PAGE_SIZE):
-        payload: Dict[str, List[str]] = {
-            "geostores": geostore_ids[i : i + GEOSTORE_PAGE_SIZE]
-        }
+    payload: Dict[str, List[str]] = {"geostores": geostore_ids}
 
-        retries = 0
-        while retries < 2:
-            r: Response = requests.post(url, json=payload, headers=headers)
+    r: Response = session().post(url, json=payload, headers=headers)
 
-            if r.status_code != 200:
-                retries += 1
-                if retries > 1:
-                    raise UnexpectedResponseError(
-                        f"geostore/find-by-ids returned response {r.status_code} on block {i}"
-                    )
-            else:
-                geostores["data"] += r.json()["data"]
-                break
+    if r.status_code != 200:
+        raise UnexpectedResponseError(
+            f"geostore/find-by-ids returned response {r.status_code} on block {block}"
+        )
 
-    return geostores
+    order: Dict[str, int] = {gid: i for i, gid in enumerate(geostore_ids)}
+    return sorted(
+        r.json()["data"], key=lambda g: order.get(g["geostoreId"], len(order))
+    )
 
 
 def filter_geostores(geostores: Dict[str, Any]) -> Dict[str, Any]:
@@ -227,71 +677,70 @@ def filter_geostores(geostores: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @contextmanager
-def geostore_to_wkb(geostore: Dict[str, Any]) -> Iterator[Tuple[io.StringIO, int]]:
+def geostore_to_wkb(
+    geostore: Dict[str, Any],
+    wkb: Optional[TSVWriter] = None,
+    manifest: Optional[List[str]] = None,
+    aliases: Optional[Dict[str, List[str]]] = None,
+    grid_size: Optional[float] = None,
+    deadline: Optional[Deadline] = None,
+    pending: Optional[List[Dict[str, Any]]] = None,
+) -> Iterator[Tuple[TSVWriter, int]]:
     """
-    Convert Geojson to WKB. Slice geometries into 1x1 degree tiles
+    Convert Geojson to WKB. Slice geometries into 1x1 degree tiles.
+    Rows are written to wkb if given, otherwise to a virtual TSV file.
+    IDs of geostores with at least one row are appended to manifest, if given.
+
+    If aliases is given, geostores with identical geometries are only tiled
+    once. Aliases then maps IDs of the tiled representatives to the IDs of their
+    duplicates, which results are expanded to on upload.
+
+    Geometries are sliced into cells of grid_size degrees, defaulting to
+    `rw_areas_grid_size`. The tcl/glad flags of other grid sizes are derived from
+    the 1x1 extent.
+
+    If a deadline is given, geostores are tiled in batches until the deadline
+    is about to expire, and the geostores that weren't tiled are appended to
+    pending. They are left out of manifest and aliases like failed geostores,
+    but not reported as errors.
     """
 
     LOGGER.info("Convert Geometries to WKB")
 
-    extent_1x1: List[Tuple[Polygon, bool, bool]] = _get_extent_1x1()
-    wkb: io.StringIO = io.StringIO()
+    extent_1x1: TileGrid = _get_grid(grid_size or GLOBALS.rw_areas_grid_size)
+    virtual_tsv: bool = wkb is None
+    if wkb is None:
+        wkb = io.StringIO()
 
-    LOGGER.info("Start writing to virtual TSV file")
+    LOGGER.info("Start writing to TSV file")
     # Column Header
-    wkb.write("geostore_id\tgeom\ttcl\tglad\n")
-    count: int = 0
+    wkb.write(TSV_HEADER)
 
     # Body
     try:
-        error_ids = []
-        for g in geostore["data"]:
-            LOGGER.info(f"Processing geostore {g['geostoreId']}")
+        geostores: List[Dict[str, Any]] = geostore["data"]
+        if aliases is not None:
+            geostores = _dedup_geostores(geostores, aliases)
 
-            try:
-                raw_geom = g["geostore"]["data"]["attributes"]["geojson"]["features"][
-                    0
-                ]["geometry"]
-
-                if raw_geom["type"] != "Polygon" and raw_geom["type"] != "MultiPolygon":
-                    LOGGER.warning(f"Invalid geometry type {g['geostoreId']}: {raw_geom['type'] }")
-                    error_ids.append(g["geostoreId"])
-                    continue
-
-                geom: Polygon = shape(raw_geom)
-
-                # dilate geometry to remove any slivers or other possible small artifacts that might cause issues
-                # in geotrellis
-                # https://gis.stackexchange.com/questions/120286/removing-small-polygon-gaps-in-shapely-polygon
-                geom = geom.buffer(0.0001).buffer(-0.0001)
-
-                # if GEOS thinks geom is invalid, try calling buffer(0) to rewrite it without changing the geometry
-                if not geom.is_valid:
-                    geom = geom.buffer(0)
-                    if (
-                        not geom.is_valid
-                    ):  # is still invalid, we'll need to look into this, but skip for now
-                        LOGGER.warning(
-                            f"Invalid geometry {g['geostoreId']}: {geom.wkt}"
-                        )
-                        error_ids.append(g["geostoreId"]["data"]["id"])
-                        continue
-
-                for tile in extent_1x1:
-                    if geom.intersects(tile[0]):
-                        LOGGER.info(
-                            f"Feature {g['geostoreId']} intersects with bounds {tile[0].bounds} -> add to WKB"
-                        )
-                        intersecting_polygon = _get_intersecting_polygon(geom, tile[0])
-
-                        if intersecting_polygon:
-                            wkb.write(
-                                f"{g['geostoreId']}\t{dumps(intersecting_polygon, hex=True)}\t{tile[1]}\t{tile[2]}\n"
-                            )
-                            count += 1
-            except Exception as e:
-                LOGGER.error(f"Error processing geostore {g['geostoreId']}")
-                raise e
+        if deadline is None:
+            count, tiled_ids, error_ids = _tile_geostore_batch(
+                geostores, extent_1x1, wkb
+            )
+        else:
+            count, tiled_ids, error_ids = _tile_geostores_until(
+                geostores, extent_1x1, wkb, deadline, pending
+            )
+
+        if aliases is not None:
+            # duplicates share the fate of their representative
+            error_ids += [gid for rep in error_ids for gid in aliases.get(rep, [])]
+            for rep in set(aliases.keys()) - set(tiled_ids):
+                del aliases[rep]
+
+        if manifest is not None:
+            manifest += tiled_ids
+            if aliases:
+                manifest += [gid for rep in tiled_ids for gid in aliases.get(rep, [])]
 
         if error_ids:
             LOGGER.info(f"Setting invalid geostore IDs to error: {error_ids}")
@@ -300,73 +749,380 @@ def geostore_to_wkb(geostore: Dict[str, Any]) -> Iterator[Tuple[io.StringIO, int
         yield (wkb, count)
 
     finally:
-        wkb.close()
+        if virtual_tsv:
+            wkb.close()
 
 
-def _get_intersecting_polygon(feature_geom, tile_geom):
+def _tile_geostores_until(
+    geostores: List[Dict[str, Any]],
+    extent_1x1: TileGrid,
+    wkb: TSVWriter,
+    deadline: Deadline,
+    pending: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[int, List[str], List[str]]:
     """
-    Get intersection of feature and tile, and ensure the result is either a Polygon or MultiPolygon,
-    or returns None if the intersection contains no polygons.
+    Tile geostores in batches of `rw_areas_checkpoint_batch_size`, as long as
+    the deadline leaves at least the time the slowest batch took. Geostores of
+    the batches that weren't started are appended to pending. The first batch
+    is always tiled, so every invocation makes progress.
     """
+    count: int = 0
+    tiled_ids: List[str] = []
+    error_ids: List[str] = []
+    slowest_batch: float = 0.0
+    batch_size: int = GLOBALS.rw_areas_checkpoint_batch_size
+
+    for i in range(0, len(geostores), batch_size):
+        if i and deadline.expired(within=slowest_batch):
+            LOGGER.warning(
+                f"Deadline approaching, {len(geostores) - i} geostores left untiled"
+            )
+            if pending is not None:
+                pending += geostores[i:]
+            break
+
+        start: float = time.monotonic()
+        batch_count, batch_ids, batch_errors = _tile_geostore_batch(
+            geostores[i : i + batch_size], extent_1x1, wkb
+        )
+        slowest_batch = max(slowest_batch, time.monotonic() - start)
 
-    intersection = feature_geom.intersection(tile_geom)
+        count += batch_count
+        tiled_ids += batch_ids
+        error_ids += batch_errors
 
-    if intersection.type == "Polygon" or intersection.type == "MultiPolygon":
-        return intersection
-    elif intersection.type == "GeometryCollection":
-        polygons = [geom for geom in intersection.geoms if geom.type == "Polygon"]
+    return count, tiled_ids, error_ids
 
-        if len(polygons) == 1:
-            return polygons[0]
-        elif len(polygons) > 1:
-            return MultiPolygon(polygons)
-        else:
-            return None
+
+def _tile_geostore_batch(
+    geostores: List[Dict[str, Any]], extent_1x1: TileGrid, wkb: TSVWriter
+) -> Tuple[int, List[str], List[str]]:
+    if GLOBALS.rw_areas_tile_cache and extent_1x1.tag:
+        return _tile_geostores_cached(geostores, extent_1x1, wkb)
     else:
-        return None
+        return _tile_geostores_with_processes(geostores, extent_1x1, wkb)
 
 
-def _get_extent_1x1() -> List[Tuple[Polygon, bool, bool]]:
+def _tile_geostores_cached(
+    geostores: List[Dict[str, Any]], extent_1x1: TileGrid, wkb: TSVWriter
+) -> Tuple[int, List[str], List[str]]:
     """
-    Fetch 1x1 degree extent file
+    Reuse rows of geostores tiled by previous runs, and only tile the rest.
+    Misses are tiled in batches, so their rows can be split by geostore and
+    cached without holding all of them in memory.
+    """
+    cache_tag: str = get_cache_tag(
+        str(extent_1x1.tag),
+        max_vertices=GLOBALS.rw_areas_max_vertices,
+        precision=GLOBALS.rw_areas_coordinate_precision,
+        tolerance=GLOBALS.rw_areas_simplify_tolerance,
+        repair_fast_path=int(GLOBALS.rw_areas_repair_fast_path),
+    )
+    cached: Dict[str, str] = get_cached_tiles(
+        [g["geostoreId"] for g in geostores], cache_tag
+    )
+
+    count: int = 0
+    tiled_ids: List[str] = []
+    error_ids: List[str] = []
+
+    for geostore_id, rows in cached.items():
+        if rows:
+            wkb.write(rows)
+            count += rows.count("\n")
+            tiled_ids.append(geostore_id)
+
+    misses: List[Dict[str, Any]] = [
+        g for g in geostores if g["geostoreId"] not in cached
+    ]
+    for i in range(0, len(misses), TILE_CACHE_BATCH_SIZE):
+        batch: List[Dict[str, Any]] = misses[i : i + TILE_CACHE_BATCH_SIZE]
+
+        with io.StringIO() as buffer:
+            batch_count, batch_ids, batch_errors = _tile_geostores_with_processes(
+                batch, extent_1x1, buffer
+            )
+            rows = buffer.getvalue()
+
+        wkb.write(rows)
+        count += batch_count
+        tiled_ids += batch_ids
+        error_ids += batch_errors
+
+        # rows of each geostore are contiguous, geostores without any rows are
+        # cached as empty so they aren't tiled again either
+        tiles: Dict[str, str] = {
+            g["geostoreId"]: "" for g in batch if g["geostoreId"] not in batch_errors
+        }
+        for geostore_id, lines in groupby(
+            rows.splitlines(keepends=True), lambda line: line.split("\t", 1)[0]
+        ):
+            tiles[geostore_id] = "".join(lines)
+
+        put_cached_tiles(tiles, cache_tag)
+
+    return count, tiled_ids, error_ids
+
+
+def _tile_geostores_with_processes(
+    geostores: List[Dict[str, Any]], extent_1x1: TileGrid, wkb: TSVWriter
+) -> Tuple[int, List[str], List[str]]:
+    processes: int = min(
+        GLOBALS.rw_areas_tiling_processes or os.cpu_count() or 1,
+        len(geostores),
+    )
+
+    if processes > 1:
+        return _tile_geostores_in_parallel(geostores, extent_1x1, wkb, processes)
+    else:
+        return _tile_geostores(geostores, extent_1x1, wkb)
+
+
+def _tile_geostores(
+    geostores: List[Dict[str, Any]], extent_1x1: TileGrid, wkb: TSVWriter
+) -> Tuple[int, List[str], List[str]]:
+    """
+    Write TSV rows of the 1x1 tiles of each geostore. Returns the number of rows
+    written, the IDs of geostores with at least one row and the IDs of geostores
+    with invalid geometries.
+    """
+    count: int = 0
+    tiled_ids: List[str] = []
+    error_ids: List[str] = []
+    repair_stats: Counter = Counter()
+
+    for g in geostores:
+        LOGGER.info(f"Processing geostore {g['geostoreId']}")
+
+        try:
+            raw_geom = g["geostore"]["data"]["attributes"]["geojson"]["features"][0][
+                "geometry"
+            ]
+
+            if raw_geom["type"] != "Polygon" and raw_geom["type"] != "MultiPolygon":
+                LOGGER.warning(
+                    f"Invalid geometry type {g['geostoreId']}: {raw_geom['type'] }"
+                )
+                error_ids.append(g["geostoreId"])
+                continue
+
+            geom = repair_geometry(
+                shape(raw_geom),
+                stats=repair_stats,
+                fast_path=GLOBALS.rw_areas_repair_fast_path,
+            )
+            if geom is None:
+                # is still invalid, we'll need to look into this, but skip for now
+                LOGGER.warning(f"Invalid geometry {g['geostoreId']}")
+                error_ids.append(g["geostoreId"])
+                continue
+
+            geostore_count: int = 0
+            for polygon, tcl, glad in tile_geometry(
+                geom, extent_1x1, GLOBALS.rw_areas_max_vertices
+            ):
+                polygon = normalize_polygon(
+                    polygon,
+                    GLOBALS.rw_areas_coordinate_precision,
+                    GLOBALS.rw_areas_simplify_tolerance,
+                )
+                LOGGER.info(
+                    f"Feature {g['geostoreId']} intersects with bounds {polygon.bounds} -> add to WKB"
+                )
+                wkb.write(
+                    f"{g['geostoreId']}\t{dumps(polygon, hex=True)}\t{tcl}\t{glad}\n"
+                )
+                geostore_count += 1
+
+            if geostore_count:
+                tiled_ids.append(g["geostoreId"])
+                count += geostore_count
+        except Exception as e:
+            LOGGER.error(f"Error processing geostore {g['geostoreId']}")
+            raise e
+
+    LOGGER.info(
+        f"Geometry repair stages of {len(geostores)} geostores: {dict(repair_stats)}"
+    )
+    return count, tiled_ids, error_ids
+
+
+def _tile_geostores_in_parallel(
+    geostores: List[Dict[str, Any]],
+    extent_1x1: TileGrid,
+    wkb: TSVWriter,
+    processes: int,
+) -> Tuple[int, List[str], List[str]]:
+    """
+    Shard geostores across worker processes and merge their TSV fragments in
+    shard order, so the output is the same as tiling them in a single process.
+
+    Uses Process and Pipe directly, since Lambda doesn't support the shared memory
+    that multiprocessing.Pool and concurrent.futures.ProcessPoolExecutor rely on.
+    """
+    LOGGER.info(f"Tiling {len(geostores)} geostores with {processes} processes")
+    shard_size: int = math.ceil(len(geostores) / processes)
+    workers: List[Tuple[Process, Connection]] = []
+
+    for i in range(0, len(geostores), shard_size):
+        recv_conn, send_conn = Pipe(duplex=False)
+        worker = Process(
+            target=_tile_geostores_worker,
+            args=(geostores[i : i + shard_size], extent_1x1, send_conn),
+        )
+        worker.start()
+        send_conn.close()
+        workers.append((worker, recv_conn))
+
+    count: int = 0
+    tiled_ids: List[str] = []
+    error_ids: List[str] = []
+    worker_errors: List[str] = []
+
+    try:
+        for worker, recv_conn in workers:
+            try:
+                (
+                    fragment,
+                    fragment_count,
+                    fragment_ids,
+                    fragment_errors,
+                    error,
+                ) = recv_conn.recv()
+            except EOFError:
+                fragment, fragment_count, fragment_ids, fragment_errors = "", 0, [], []
+                error = f"Tiling process exited with code {worker.exitcode}"
+
+            if error:
+                worker_errors.append(error)
+            else:
+                wkb.write(fragment)
+                count += fragment_count
+                tiled_ids += fragment_ids
+                error_ids += fragment_errors
+    finally:
+        for worker, recv_conn in workers:
+            recv_conn.close()
+            worker.join()
+
+    if worker_errors:
+        raise Exception(f"Error tiling geostores: {worker_errors}")
+
+    return count, tiled_ids, error_ids
+
+
+def _tile_geostores_worker(
+    geostores: List[Dict[str, Any]], extent_1x1: TileGrid, send_conn: Connection
+) -> None:
+    with io.StringIO() as fragment:
+        try:
+            count, tiled_ids, error_ids = _tile_geostores(
+                geostores, extent_1x1, fragment
+            )
+            send_conn.send((fragment.getvalue(), count, tiled_ids, error_ids, None))
+        except Exception:
+            send_conn.send(("", 0, [], [], traceback.format_exc()))
+        finally:
+            send_conn.close()
+
+
+def _get_grid(cell_size: float) -> TileGrid:
+    """
+    Get extent grid resampled to the cell size, cached along with the 1x1 grid
+    """
+    extent_1x1: TileGrid = _get_extent_1x1()
+    if cell_size == extent_1x1.cell_size:
+        return extent_1x1
+
+    key: str = f"{extent_1x1.tag}_{cell_size:g}"
+    if key not in _EXTENT_1X1_CACHE:
+        LOGGER.info(f"Resample extent grid to {cell_size:g} degree cells")
+        _EXTENT_1X1_CACHE[key] = extent_1x1.resample(cell_size)
+
+    return _EXTENT_1X1_CACHE[key]
+
+
+def _get_extent_1x1() -> TileGrid:
+    """
+    Fetch 1x1 degree extent file and index the tiles by grid cell.
+
+    The indexed grid is cached in memory and in /tmp, keyed by the ETag of the
+    extent file, so warm Lambda containers skip downloading and parsing it again.
     """
     LOGGER.info("Fetch Extent File")
     result_bucket = os.environ["S3_BUCKET_PIPELINE"]
-    response: Dict[str, Any] = get_s3_client().get_object(
-        Bucket=result_bucket,
-        Key="geotrellis/features/extent_1x1.geojson",
+    etag: str = (
+        get_s3_client()
+        .head_object(Bucket=result_bucket, Key=EXTENT_1X1_KEY)["ETag"]
+        .strip('"')
     )
 
-    glad_tiles: Dict[str, Any] = json.load(response["Body"])
-
-    extent_1x1: List[Tuple[Polygon, bool, bool]] = list()
+    if etag in _EXTENT_1X1_CACHE:
+        LOGGER.info(f"Using cached extent grid for ETag {etag}")
+        return _EXTENT_1X1_CACHE[etag]
 
-    LOGGER.info("Read Extent Features")
+    cache_path: str = os.path.join(TEMP_DIR, f"extent_1x1_{etag}.npz")
 
-    for feature in glad_tiles["features"]:
-        geom: Polygon = shape(feature["geometry"])
-        extent_1x1.append(
-            (geom, feature["properties"]["tcl"], feature["properties"]["glad"])
+    if os.path.isfile(cache_path):
+        LOGGER.info(f"Read Extent Grid from {cache_path}")
+        extent_1x1: TileGrid = TileGrid.load(cache_path)
+    else:
+        response: Dict[str, Any] = get_s3_client().get_object(
+            Bucket=result_bucket, Key=EXTENT_1X1_KEY, IfMatch=etag
         )
 
+        LOGGER.info("Read Extent Features")
+        extent_1x1 = TileGrid.from_geojson(json.load(response["Body"]))
+
+        # write to a temporary file first, so concurrent or interrupted invocations
+        # never read a partially written cache file
+        tmp_path = f"{cache_path}.{os.getpid()}"
+        extent_1x1.save(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    extent_1x1.tag = etag
+    _EXTENT_1X1_CACHE.clear()
+    _EXTENT_1X1_CACHE[etag] = extent_1x1
+
     return extent_1x1
 
 
-def get_aoi_geostore_ids(aoi_src: str) -> Set[str]:
-    geostore_ids = set()
-    aoi_bucket, aoi_key = get_s3_path_parts(aoi_src)
+def _get_aliases() -> Optional[Dict[str, List[str]]]:
+    return dict() if GLOBALS.rw_areas_dedup_geometries else None
 
-    with io.BytesIO() as data:
-        get_s3_client().download_fileobj(aoi_bucket, aoi_key, data)
 
-        rows = data.getvalue().decode("utf-8").split("\n")
+def _dedup_geostores(
+    geostores: List[Dict[str, Any]], aliases: Dict[str, List[str]]
+) -> List[Dict[str, Any]]:
+    """
+    Keep one representative per geometry, identified by a hash of the WKB of its
+    canonical form, so ring orientation and vertex order don't matter.
+    IDs of the other geostores with the same geometry are added to aliases.
+    """
+    representatives: Dict[str, Dict[str, Any]] = dict()
+
+    for g in geostores:
+        try:
+            raw_geom = g["geostore"]["data"]["attributes"]["geojson"]["features"][0][
+                "geometry"
+            ]
+            geom_hash = blake2b(
+                canonical_wkb(shape(raw_geom)), digest_size=16
+            ).hexdigest()
+        except Exception:
+            # leave it to tiling to report invalid geometries
+            geom_hash = g["geostoreId"]
+
+        if geom_hash in representatives:
+            rep_id = representatives[geom_hash]["geostoreId"]
+            aliases.setdefault(rep_id, []).append(g["geostoreId"])
+        else:
+            representatives[geom_hash] = g
 
-    first = True
-    for row in rows:
-        geostore_id = row.split("\t")[0]
-        if first:
-            first = False
-        elif geostore_id:
-            geostore_ids.add(geostore_id)
+    deduped: List[Dict[str, Any]] = list(representatives.values())
+    if len(deduped) < len(geostores):
+        LOGGER.info(
+            f"Deduplicated {len(geostores)} geostores to {len(deduped)} geometries"
+        )
 
-    return geostore_ids
+    return deduped
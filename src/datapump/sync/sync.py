@@ -2,7 +2,7 @@ import traceback
 from abc import ABC, abstractmethod
 from datetime import date, datetime, timedelta
 from string import ascii_uppercase
-from typing import Dict, List, Optional, Tuple, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 from uuid import uuid1
 
 import dateutil.tz as tz
@@ -17,10 +17,10 @@ from ..jobs.geotrellis import FireAlertsGeotrellisJob, GeotrellisJob, Job
 from ..jobs.jobs import JobStatus
 from ..jobs.version_update import RasterVersionUpdateJob
 from ..sync.fire_alerts import process_active_fire_alerts
-from ..sync.rw_areas import create_1x1_tsv
+from ..sync.rw_areas import create_1x1_tsv, stage_geostore_chunks
 from ..util.gcs import get_gs_file_as_text, get_gs_files, get_gs_subfolders
 from ..util.models import ContentDateRange
-from ..util.util import log_and_notify_error
+from ..util.util import Deadline, log_and_notify_error
 from ..util.slack import slack_webhook
 
 
@@ -49,10 +49,22 @@ class FireAlertsSync(Sync):
         self.fire_alerts_uri: Optional[str] = None
         self.content_end_date: Optional[str] = None
 
+    def process_fire_alerts(self, alert_type: SyncType) -> None:
+        """
+        Save new alerts of the alert type, if there are any
+        """
+        result = process_active_fire_alerts(alert_type.value)
+        if result is not None:
+            self.fire_alerts_uri, self.content_end_date = result
+
     def build_jobs(self, config: DatapumpConfig) -> List[Job]:
         if self.fire_alerts_type is None:
             raise RuntimeError("No Alert type set")
 
+        # feed unchanged or no alerts since the last sync
+        if self.fire_alerts_uri is None:
+            return []
+
         return [
             FireAlertsGeotrellisJob(
                 id=str(uuid1()),
@@ -80,18 +92,14 @@ class ViirsSync(FireAlertsSync):
     def __init__(self, sync_version: str):
         super(ViirsSync, self).__init__(sync_version)
         self.fire_alerts_type = SyncType.viirs
-        self.fire_alerts_uri, self.content_end_date = process_active_fire_alerts(
-            self.fire_alerts_type.value
-        )
+        self.process_fire_alerts(self.fire_alerts_type)
 
 
 class ModisSync(FireAlertsSync):
     def __init__(self, sync_version: str):
         super(ModisSync, self).__init__(sync_version)
         self.fire_alerts_type = SyncType.modis
-        self.fire_alerts_uri, self.content_end_date = process_active_fire_alerts(
-            self.fire_alerts_type.value
-        )
+        self.process_fire_alerts(self.fire_alerts_type)
 
 
 class GladSync(Sync):
@@ -840,12 +848,23 @@ class DISTAlertsSync(Sync):
         return jobs
 
 class RWAreasSync(Sync):
-    def __init__(self, sync_version: str):
+    def __init__(self, sync_version: str, deadline: Optional[Deadline] = None):
         self.sync_version = sync_version
-        self.features_1x1 = create_1x1_tsv(sync_version)
+        self.tiling_chunks: List[Dict[str, Any]] = []
+
+        if GLOBALS.rw_areas_distributed_tiling:
+            # feature files are written by the tiler Lambda before jobs run
+            self.features_1x1, self.tiling_chunks = stage_geostore_chunks(
+                sync_version
+            )
+        else:
+            self.features_1x1 = create_1x1_tsv(sync_version, deadline=deadline)
 
     def build_jobs(self, config: DatapumpConfig) -> List[Job]:
-        if self.features_1x1:
+        jobs: List[Job] = []
+
+        # one job per shard of geostores
+        for features_1x1 in self.features_1x1:
             kwargs = {
                 "id": str(uuid1()),
                 "status": JobStatus.starting,
@@ -856,7 +875,7 @@ class RWAreasSync(Sync):
                     version=config.dataset_version,
                     analysis=config.analysis,
                 ),
-                "features_1x1": self.features_1x1,
+                "features_1x1": features_1x1,
                 "geotrellis_version": config.metadata["geotrellis_version"],
                 "sync_type": config.sync_type,
                 "version_overrides": config.metadata.get("version_overrides", {}),
@@ -864,11 +883,11 @@ class RWAreasSync(Sync):
 
             if config.analysis in FIRES_ANALYSES:
                 kwargs["alert_type"] = config.analysis
-                return [FireAlertsGeotrellisJob(**kwargs)]
+                jobs.append(FireAlertsGeotrellisJob(**kwargs))
             else:
-                return [GeotrellisJob(**kwargs)]
-        else:
-            return []
+                jobs.append(GeotrellisJob(**kwargs))
+
+        return jobs
 
 
 class Syncer:
@@ -884,19 +903,42 @@ class Syncer:
         SyncType.umd_glad_dist_alerts: DISTAlertsSync,
     }
 
-    def __init__(self, sync_types: List[SyncType], sync_version: str = None):
+    def __init__(
+        self,
+        sync_types: List[SyncType],
+        sync_version: str = None,
+        deadline: Optional[Deadline] = None,
+    ):
         self.sync_version: str = (
             sync_version if sync_version else self._get_latest_version()
         )
         self.syncers: Dict[SyncType, Sync] = {
-            sync_type: self.SYNCERS[sync_type](self.sync_version)
+            sync_type: self._get_syncer(sync_type, deadline)
             for sync_type in sync_types
         }
 
+    def _get_syncer(self, sync_type: SyncType, deadline: Optional[Deadline]) -> Sync:
+        # only RW areas tiling can stop early when the Lambda runs out of time
+        if sync_type == SyncType.rw_areas:
+            return RWAreasSync(self.sync_version, deadline)
+        else:
+            return self.SYNCERS[sync_type](self.sync_version)
+
     @staticmethod
     def _get_latest_version() -> str:
         return f"v{datetime.now().strftime('%Y%m%d')}"
 
+    def get_tiling_chunks(self) -> List[Dict[str, Any]]:
+        """
+        Geostore chunks staged for distributed tiling, if any
+        """
+        return [
+            chunk
+            for syncer in self.syncers.values()
+            if isinstance(syncer, RWAreasSync)
+            for chunk in syncer.tiling_chunks
+        ]
+
     def build_jobs(self, config: DatapumpConfig) -> List[Job]:
         """
         Build Job model based on sync type
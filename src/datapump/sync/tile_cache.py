@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..clients.aws import get_s3_client
+from ..globals import GLOBALS, LOGGER
+from ..util.util import Deadline
+
+TILE_CACHE_PREFIX = "geotrellis/features/geostore_cache"
+
+# bump whenever tiling changes the rows written for the same geometry and grid
+TILE_CACHE_VERSION = "v2"
+
+# stay within the default connection pool size of the S3 client
+TILE_CACHE_WORKERS = 10
+
+
+def get_cache_tag(grid_tag: str, **options: Any) -> str:
+    """
+    Tag of cache entries, which changes with the grid and with any tiling
+    option that changes the rows written
+    """
+    tag: str = f"{TILE_CACHE_VERSION}_{grid_tag}"
+    for name, value in sorted(options.items()):
+        if value is not None:
+            tag += f"_{name}{value:g}"
+
+    return tag
+
+
+def get_cached_tiles(geostore_ids: List[str], cache_tag: str) -> Dict[str, str]:
+    """
+    Look up the TSV rows of already tiled geostores. Geostores are immutable, so
+    rows are keyed by geostore ID and a tag of the grid and tiling version.
+    Entries older than `rw_areas_tile_cache_ttl_days` are evicted and count as a
+    miss. Returns rows by geostore ID for every hit.
+    """
+    with ThreadPoolExecutor(max_workers=TILE_CACHE_WORKERS) as executor:
+        results = executor.map(
+            lambda geostore_id: _get_cached_tile(geostore_id, cache_tag),
+            geostore_ids,
+        )
+        cached: Dict[str, str] = {
+            geostore_id: rows
+            for geostore_id, rows in zip(geostore_ids, results)
+            if rows is not None
+        }
+
+    if geostore_ids:
+        LOGGER.info(
+            f"Tile cache hit rate: {len(cached)}/{len(geostore_ids)} geostores "
+            f"({len(cached) / len(geostore_ids):.0%})"
+        )
+
+    return cached
+
+
+def put_cached_tiles(tiles: Dict[str, str], cache_tag: str) -> None:
+    """
+    Store the TSV rows of tiled geostores, keyed by geostore ID
+    """
+    with ThreadPoolExecutor(max_workers=TILE_CACHE_WORKERS) as executor:
+        list(
+            executor.map(lambda item: _put_cached_tile(item, cache_tag), tiles.items())
+        )
+
+
+def sweep_tile_cache(
+    ttl_days: Optional[int] = None, deadline: Optional[Deadline] = None
+) -> int:
+    """
+    Delete cache entries older than ttl_days, which defaults to
+    `rw_areas_tile_cache_ttl_days`. Lookups only evict the entries they read,
+    and most geostores are tiled once and never looked up again. Returns the
+    number of entries deleted.
+    """
+    ttl = timedelta(days=ttl_days or GLOBALS.rw_areas_tile_cache_ttl_days)
+    expiry: datetime = datetime.now(timezone.utc) - ttl
+    deleted: int = 0
+
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(
+        Bucket=GLOBALS.s3_bucket_pipeline, Prefix=f"{TILE_CACHE_PREFIX}/"
+    ):
+        # pages hold at most 1000 keys, as many as a single delete request
+        expired: List[Dict[str, str]] = [
+            {"Key": obj["Key"]}
+            for obj in page.get("Contents", [])
+            if obj["LastModified"] < expiry
+        ]
+        if expired:
+            get_s3_client().delete_objects(
+                Bucket=GLOBALS.s3_bucket_pipeline,
+                Delete={"Objects": expired, "Quiet": True},
+            )
+            deleted += len(expired)
+
+        if deadline is not None and deadline.expired():
+            LOGGER.info("Sweeping the tile cache hit the deadline, stopping")
+            break
+
+    LOGGER.info(f"Deleted {deleted} expired tile cache entries")
+    return deleted
+
+
+def _get_cache_key(geostore_id: str, cache_tag: str) -> str:
+    return f"{TILE_CACHE_PREFIX}/{cache_tag}/{geostore_id}.tsv"
+
+
+def _get_cached_tile(geostore_id: str, cache_tag: str) -> Optional[str]:
+    key = _get_cache_key(geostore_id, cache_tag)
+
+    try:
+        response = get_s3_client().get_object(
+            Bucket=GLOBALS.s3_bucket_pipeline, Key=key
+        )
+    except get_s3_client().exceptions.NoSuchKey:
+        return None
+    except Exception as e:
+        LOGGER.warning(f"Could not look up cached tiles of geostore {geostore_id}: {e}")
+        return None
+
+    ttl = timedelta(days=GLOBALS.rw_areas_tile_cache_ttl_days)
+    if response["LastModified"] + ttl < datetime.now(timezone.utc):
+        get_s3_client().delete_object(Bucket=GLOBALS.s3_bucket_pipeline, Key=key)
+        return None
+
+    return response["Body"].read().decode("utf-8")
+
+
+def _put_cached_tile(item: Tuple[str, str], cache_tag: str) -> None:
+    geostore_id, rows = item
+
+    try:
+        get_s3_client().put_object(
+            Bucket=GLOBALS.s3_bucket_pipeline,
+            Key=_get_cache_key(geostore_id, cache_tag),
+            Body=rows.encode("utf-8"),
+        )
+    except Exception as e:
+        # the cache is an optimization, never fail tiling because of it
+        LOGGER.warning(f"Could not cache tiles of geostore {geostore_id}: {e}")
@@ -0,0 +1,479 @@
+import math
+from collections import Counter
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from shapely.geometry import MultiPolygon, Polygon, box, shape
+from shapely.geometry.polygon import orient
+from shapely.ops import transform
+from shapely.prepared import prep
+
+Tile = Tuple[Polygon, bool, bool]
+
+# smallest sub-cells are 1/2^8 of a cell wide
+MAX_SPLIT_DEPTH = 8
+
+# distance in degrees of the dilate/erode used to close small gaps in geometries
+REPAIR_DISTANCE = 0.0001
+
+
+class TileClass(str, Enum):
+    interior = "interior"
+    boundary = "boundary"
+    outside = "outside"
+
+
+class TileGrid:
+    """
+    Regular grid of extent tiles with their tcl/glad flags, indexed by cell so the
+    tiles touched by a geometry can be looked up from its bounds instead of testing
+    the geometry against every tile in the extent.
+
+    Cells are stored as NumPy arrays of column/row numbers plus tcl/glad flags, which
+    can be saved to and loaded from a compact binary file. Tile polygons are only
+    built for cells that are actually looked up.
+    """
+
+    def __init__(
+        self,
+        cols: np.ndarray,
+        rows: np.ndarray,
+        tcl: np.ndarray,
+        glad: np.ndarray,
+        cell_size: float = 1.0,
+        tag: Optional[str] = None,
+    ):
+        # identifies the source of the grid, e.g. the ETag of the extent file
+        self.tag: Optional[str] = tag
+        self.cell_size: float = cell_size
+        self.cols: np.ndarray = cols.astype(np.int32)
+        self.rows: np.ndarray = rows.astype(np.int32)
+        self.tcl: np.ndarray = tcl.astype(bool)
+        self.glad: np.ndarray = glad.astype(bool)
+
+        self._index: Dict[Tuple[int, int], int] = {
+            cell: i
+            for i, cell in enumerate(zip(self.cols.tolist(), self.rows.tolist()))
+        }
+        self._tiles: Dict[int, Tile] = dict()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @classmethod
+    def from_tiles(cls, tiles: Iterable[Tile], cell_size: float = 1.0) -> "TileGrid":
+        cols, rows, tcl, glad = [], [], [], []
+
+        for geom, tile_tcl, tile_glad in tiles:
+            left, bottom, _, _ = geom.bounds
+            cols.append(round(left / cell_size))
+            rows.append(round(bottom / cell_size))
+            tcl.append(tile_tcl)
+            glad.append(tile_glad)
+
+        return cls(
+            np.array(cols), np.array(rows), np.array(tcl), np.array(glad), cell_size
+        )
+
+    @classmethod
+    def from_geojson(
+        cls, feature_collection: Dict[str, Any], cell_size: float = 1.0
+    ) -> "TileGrid":
+        return cls.from_tiles(
+            (
+                (
+                    shape(feature["geometry"]),
+                    feature["properties"]["tcl"],
+                    feature["properties"]["glad"],
+                )
+                for feature in feature_collection["features"]
+            ),
+            cell_size,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TileGrid":
+        with np.load(path) as data:
+            count = int(data["count"])
+            return cls(
+                data["cols"],
+                data["rows"],
+                np.unpackbits(data["tcl"], count=count),
+                np.unpackbits(data["glad"], count=count),
+                float(data["cell_size"]),
+            )
+
+    def save(self, path: str) -> None:
+        """
+        Save grid to a NumPy .npz file, with the tcl/glad flags packed into bitsets
+        """
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                count=len(self),
+                cell_size=self.cell_size,
+                cols=self.cols.astype(np.int16),
+                rows=self.rows.astype(np.int16),
+                tcl=np.packbits(self.tcl),
+                glad=np.packbits(self.glad),
+            )
+
+    def resample(self, cell_size: float) -> "TileGrid":
+        """
+        Resample grid to another cell size, which must evenly divide or be a
+        multiple of the current one. Finer cells inherit the tcl/glad flags of
+        the cell they split, coarser cells are flagged if any cell they merge is.
+        """
+        if cell_size == self.cell_size:
+            return self
+
+        tag: Optional[str] = f"{self.tag}_{cell_size:g}" if self.tag else None
+
+        if cell_size < self.cell_size:
+            factor: int = self._get_factor(self.cell_size, cell_size)
+            offsets: np.ndarray = np.arange(factor)
+            col_offsets, row_offsets = np.meshgrid(offsets, offsets, indexing="ij")
+
+            return TileGrid(
+                (self.cols[:, None] * factor + col_offsets.ravel()).ravel(),
+                (self.rows[:, None] * factor + row_offsets.ravel()).ravel(),
+                np.repeat(self.tcl, factor * factor),
+                np.repeat(self.glad, factor * factor),
+                cell_size,
+                tag,
+            )
+        else:
+            factor = self._get_factor(cell_size, self.cell_size)
+            cells: np.ndarray = np.stack(
+                [self.cols // factor, self.rows // factor], axis=1
+            )
+            merged_cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+
+            tcl: np.ndarray = np.zeros(len(merged_cells), dtype=bool)
+            glad: np.ndarray = np.zeros(len(merged_cells), dtype=bool)
+            np.logical_or.at(tcl, inverse, self.tcl)
+            np.logical_or.at(glad, inverse, self.glad)
+
+            return TileGrid(
+                merged_cells[:, 0], merged_cells[:, 1], tcl, glad, cell_size, tag
+            )
+
+    @staticmethod
+    def _get_factor(coarse: float, fine: float) -> int:
+        factor: int = round(coarse / fine)
+        if factor < 1 or not math.isclose(factor * fine, coarse):
+            raise ValueError(
+                f"Cell size {fine} must evenly divide cell size {coarse} to resample"
+            )
+
+        return factor
+
+    def candidates(self, geom) -> Iterator[Tile]:
+        """
+        Yield every tile whose cell overlaps the bounds of a part of the geometry.
+        Parts are looked up separately, so multipolygons split at the antimeridian
+        don't scan every cell of the longitudes in between.
+        """
+        cells: Set[Tuple[int, int]] = set()
+        for part in getattr(geom, "geoms", [geom]):
+            min_x, min_y, max_x, max_y = part.bounds
+            min_col, min_row = self._cell(min_x, min_y)
+            max_col, max_row = self._cell(max_x, max_y)
+
+            cells.update(
+                (col, row)
+                for col in range(min_col, max_col + 1)
+                for row in range(min_row, max_row + 1)
+            )
+
+        for cell in sorted(cells):
+            i = self._index.get(cell)
+            if i is not None:
+                yield self._tile(i)
+
+    def _tile(self, i: int) -> Tile:
+        if i not in self._tiles:
+            left = int(self.cols[i]) * self.cell_size
+            bottom = int(self.rows[i]) * self.cell_size
+            self._tiles[i] = (
+                box(left, bottom, left + self.cell_size, bottom + self.cell_size),
+                bool(self.tcl[i]),
+                bool(self.glad[i]),
+            )
+
+        return self._tiles[i]
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+
+def classify_tiles(geom, grid: TileGrid) -> Iterator[Tuple[Tile, TileClass]]:
+    """
+    Classify each candidate tile of the grid against a prepared version of the
+    geometry. Interior tiles are completely covered by the geometry, boundary
+    tiles are only partially covered and outside tiles don't intersect at all.
+    """
+    prepared_geom = prep(geom)
+
+    for tile in grid.candidates(geom):
+        if prepared_geom.contains(tile[0]):
+            yield tile, TileClass.interior
+        elif prepared_geom.intersects(tile[0]):
+            yield tile, TileClass.boundary
+        else:
+            yield tile, TileClass.outside
+
+
+def tile_geometry(
+    geom, grid: TileGrid, max_vertices: Optional[int] = None
+) -> Iterator[Tile]:
+    """
+    Slice geometry into the tiles of the grid. Interior tiles are emitted as is,
+    only boundary tiles are clipped to the geometry. Clipped tiles with more than
+    max_vertices vertices are split further into sub-cells.
+    """
+    for tile, tile_class in classify_tiles(geom, grid):
+        if tile_class == TileClass.interior:
+            yield tile
+        elif tile_class == TileClass.boundary:
+            intersecting_polygon = _get_intersecting_polygon(geom, tile[0])
+
+            if intersecting_polygon:
+                for polygon in split_by_vertex_budget(
+                    intersecting_polygon, tile[0], max_vertices
+                ):
+                    yield polygon, tile[1], tile[2]
+
+
+def split_by_vertex_budget(
+    polygon, cell: Polygon, max_vertices: Optional[int], depth: int = 0
+) -> Iterator[Polygon]:
+    """
+    Recursively split a clipped cell into quadrants until every piece has at
+    most max_vertices vertices, so no single row is much more expensive to
+    analyze than the others
+    """
+    if (
+        not max_vertices
+        or depth >= MAX_SPLIT_DEPTH
+        or count_vertices(polygon) <= max_vertices
+    ):
+        yield polygon
+        return
+
+    min_x, min_y, max_x, max_y = cell.bounds
+    mid_x, mid_y = (min_x + max_x) / 2, (min_y + max_y) / 2
+
+    for quadrant in (
+        box(min_x, min_y, mid_x, mid_y),
+        box(mid_x, min_y, max_x, mid_y),
+        box(min_x, mid_y, mid_x, max_y),
+        box(mid_x, mid_y, max_x, max_y),
+    ):
+        piece = _get_intersecting_polygon(polygon, quadrant)
+
+        if piece:
+            yield from split_by_vertex_budget(piece, quadrant, max_vertices, depth + 1)
+
+
+def normalize_polygon(
+    polygon, precision: Optional[float] = None, tolerance: Optional[float] = None
+):
+    """
+    Simplify polygon within tolerance and snap its coordinates to a grid of the
+    given precision, dropping vertices that collapse onto their neighbours.
+    If the result isn't a valid polygon, even after buffer(0), the original
+    polygon is returned.
+    """
+    if not precision and not tolerance:
+        return polygon
+
+    normalized = polygon
+    if tolerance:
+        normalized = normalized.simplify(tolerance, preserve_topology=True)
+
+    if precision:
+        normalized = transform(
+            lambda *coords: tuple(
+                np.round(np.asarray(c) / precision) * precision for c in coords
+            ),
+            normalized,
+        ).simplify(0)
+
+    if not normalized.is_valid:
+        normalized = normalized.buffer(0)
+
+    if (
+        normalized.is_empty
+        or not normalized.is_valid
+        or normalized.type not in ("Polygon", "MultiPolygon")
+    ):
+        return polygon
+
+    return normalized
+
+
+def repair_geometry(
+    geom,
+    distance: float = REPAIR_DISTANCE,
+    stats: Optional[Counter] = None,
+    fast_path: bool = True,
+):
+    """
+    Close slivers, small holes and narrow gaps between parts of a geometry that
+    might cause issues in Geotrellis, by dilating and eroding it by distance
+    (https://gis.stackexchange.com/questions/120286/removing-small-polygon-gaps-in-shapely-polygon).
+    If the result is still invalid, buffer(0) is used to rewrite it.
+
+    With fast_path, the buffers are only applied to geometries that cheap checks
+    flag as invalid or as having any of these artifacts. Valid geometries without
+    them are returned as is.
+
+    Counts geometries per repair stage in stats. Returns None if the geometry
+    can't be repaired.
+    """
+    stats = stats if stats is not None else Counter()
+
+    reason: Optional[str] = (
+        get_repair_reason(geom, distance) if fast_path else "no_fast_path"
+    )
+    if reason is None:
+        stats["fast_path"] += 1
+        return geom
+
+    stats[reason] += 1
+    geom = geom.buffer(distance).buffer(-distance)
+
+    # if GEOS thinks geom is invalid, try calling buffer(0) to rewrite it without
+    # changing the geometry
+    if not geom.is_valid:
+        stats["buffer0"] += 1
+        geom = geom.buffer(0)
+
+        if not geom.is_valid:
+            stats["failed"] += 1
+            return None
+
+    return geom
+
+
+def get_repair_reason(geom, distance: float = REPAIR_DISTANCE) -> Optional[str]:
+    """
+    Cheap checks for artifacts the dilate/erode of repair_geometry would change.
+    Returns the first reason found, or None if the geometry doesn't need repair.
+
+    Rings whose area is small relative to their length are either slivers
+    thinner than about 2 * distance or tiny holes, and parts of multipolygons
+    whose bounds are within 2 * distance of each other might have gaps to close.
+    """
+    if geom.is_empty or not geom.is_valid:
+        return "invalid"
+
+    polygons: List[Polygon] = (
+        list(geom.geoms) if geom.type == "MultiPolygon" else [geom]
+    )
+
+    for polygon in polygons:
+        if _is_sliver(polygon.exterior, distance):
+            return "sliver"
+
+        # only polygons with holes pay for the checks of interior rings
+        if any(_is_sliver(interior, distance) for interior in polygon.interiors):
+            return "small_hole"
+
+    if len(polygons) > 1 and _has_close_parts(polygons, 2 * distance):
+        return "close_parts"
+
+    return None
+
+
+def _is_sliver(ring, distance: float) -> bool:
+    # a strip of width w has about w / 2 of area per unit of perimeter
+    return Polygon(ring).area < ring.length * distance
+
+
+def _has_close_parts(polygons: List[Polygon], distance: float) -> bool:
+    """
+    Check whether the bounds of any two polygons are within distance of each
+    other, sweeping over the polygons sorted by their minimum x
+    """
+    bounds = sorted(polygon.bounds for polygon in polygons)
+
+    for i, (_, min_y, max_x, max_y) in enumerate(bounds):
+        for other_min_x, other_min_y, _, other_max_y in bounds[i + 1 :]:
+            if other_min_x > max_x + distance:
+                break
+            if other_min_y <= max_y + distance and min_y <= other_max_y + distance:
+                return True
+
+    return False
+
+
+def count_vertices(geom) -> int:
+    if geom.type == "MultiPolygon":
+        return sum(count_vertices(polygon) for polygon in geom.geoms)
+    elif geom.type == "Polygon":
+        return len(geom.exterior.coords) + sum(
+            len(interior.coords) for interior in geom.interiors
+        )
+    else:
+        return 0
+
+
+def canonical_wkb(geom) -> bytes:
+    """
+    WKB of a canonical form of a (multi)polygon, the same for equal geometries
+    whatever the orientation and start of their rings, and the order of their
+    holes and parts. Other geometries are returned as is.
+    """
+    if geom.type == "Polygon":
+        polygons = [geom]
+    elif geom.type == "MultiPolygon":
+        polygons = list(geom.geoms)
+    else:
+        return geom.wkb
+
+    parts = [_canonical_polygon(polygon) for polygon in polygons]
+    return MultiPolygon(sorted(parts, key=lambda part: part.wkb)).wkb
+
+
+def _canonical_polygon(polygon: Polygon) -> Polygon:
+    oriented = orient(polygon, sign=1.0)
+    return Polygon(
+        _canonical_ring(oriented.exterior),
+        sorted(_canonical_ring(interior) for interior in oriented.interiors),
+    )
+
+
+def _canonical_ring(ring) -> List[Tuple[float, ...]]:
+    """
+    Coordinates of a ring, starting at its smallest vertex
+    """
+    coords: List[Tuple[float, ...]] = list(ring.coords)[:-1]
+    start: int = coords.index(min(coords))
+    return coords[start:] + coords[:start]
+
+
+def _get_intersecting_polygon(feature_geom, tile_geom) -> Optional[Polygon]:
+    """
+    Get intersection of feature and tile, and ensure the result is either a Polygon or MultiPolygon,
+    or returns None if the intersection contains no polygons.
+    """
+
+    intersection = feature_geom.intersection(tile_geom)
+
+    if intersection.type == "Polygon" or intersection.type == "MultiPolygon":
+        return intersection
+    elif intersection.type == "GeometryCollection":
+        polygons = [geom for geom in intersection.geoms if geom.type == "Polygon"]
+
+        if len(polygons) == 1:
+            return polygons[0]
+        elif len(polygons) > 1:
+            return MultiPolygon(polygons)
+        else:
+            return None
+    else:
+        return None
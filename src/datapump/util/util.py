@@ -1,4 +1,6 @@
+import time
 from datetime import date
+from typing import Optional
 
 from ..globals import GLOBALS, LOGGER
 from ..util.slack import slack_webhook
@@ -49,3 +51,35 @@ def log_and_notify_error(msg):
     LOGGER.error(msg)
     slack_webhook("ERROR", msg)
     return {"status": "FAILED"}
+
+
+class Deadline:
+    """
+    Time budget of a Lambda invocation, which expires a margin before the
+    invocation would time out to leave time to save progress
+    """
+
+    def __init__(self, seconds: float, margin: float = 0):
+        self._end: float = time.monotonic() + seconds - margin
+
+    @classmethod
+    def from_context(cls, context) -> Optional["Deadline"]:
+        """
+        Deadline of the invocation of a Lambda context, or None outside of Lambda
+        """
+        if not hasattr(context, "get_remaining_time_in_millis"):
+            return None
+
+        return cls(
+            context.get_remaining_time_in_millis() / 1000,
+            GLOBALS.lambda_deadline_margin_sec,
+        )
+
+    def remaining(self) -> float:
+        return self._end - time.monotonic()
+
+    def expired(self, within: float = 0) -> bool:
+        """
+        Whether the deadline has passed, or will within the given seconds
+        """
+        return self.remaining() <= within
@@ -0,0 +1,284 @@
+import io
+import os
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..clients.aws import get_s3_client, get_s3_path_parts
+from ..globals import LOGGER
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+# S3 requires every part except the last to be at least 5 MB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+
+class ObjectWriter(io.IOBase):
+    """
+    Base class for writers that stream text or bytes to an object as it is produced.
+    Used as a context manager, the object is finalized on exit, or aborted if an
+    exception was raised.
+    """
+
+    def __init__(self, uri: str, encoding: str = "utf-8"):
+        self.uri: str = uri
+        self._encoding: str = encoding
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Union[str, bytes]) -> int:  # type: ignore[override]
+        if self.closed:
+            raise ValueError(f"Write to closed writer for {self.uri}")
+
+        encoded: bytes = data.encode(self._encoding) if isinstance(data, str) else data
+        self._write(encoded)
+        return len(data)
+
+    def abort(self) -> None:
+        """
+        Discard everything written so far, without creating the object
+        """
+        if not self.closed:
+            self._abort()
+            super().close()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._finalize()
+            super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def __del__(self) -> None:
+        # never finalize a partially written object when a writer is discarded
+        # without being closed
+        if not self.closed:
+            try:
+                self.abort()
+            except Exception:
+                pass
+
+    def _write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _finalize(self) -> None:
+        raise NotImplementedError
+
+    def _abort(self) -> None:
+        raise NotImplementedError
+
+
+class S3MultipartWriter(ObjectWriter):
+    """
+    Stream to an S3 object with a multipart upload, uploading a part every time
+    the buffered bytes reach the part size. Objects smaller than a single part are
+    uploaded with a regular PUT instead.
+    """
+
+    def __init__(
+        self, uri: str, part_size: int = DEFAULT_PART_SIZE, encoding: str = "utf-8"
+    ):
+        super().__init__(uri, encoding)
+
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"Part size must be at least {MIN_PART_SIZE} bytes")
+
+        self.bucket, self.key = get_s3_path_parts(uri)
+        self._part_size: int = part_size
+        self._buffer: bytearray = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    def _write(self, data: bytes) -> None:
+        self._buffer += data
+
+        if len(self._buffer) >= self._part_size:
+            self._upload_part()
+
+    def _upload_part(self) -> None:
+        client = get_s3_client()
+
+        if self._upload_id is None:
+            self._upload_id = client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key
+            )["UploadId"]
+
+        part_number: int = len(self._parts) + 1
+        response = client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self._buffer = bytearray()
+
+        LOGGER.debug(f"Uploaded part {part_number} of {self.uri}")
+
+    def _finalize(self) -> None:
+        if self._upload_id is None:
+            get_s3_client().put_object(
+                Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer)
+            )
+        else:
+            if self._buffer:
+                self._upload_part()
+
+            get_s3_client().complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+
+        self._buffer = bytearray()
+
+    def _abort(self) -> None:
+        if self._upload_id is not None:
+            get_s3_client().abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+
+        self._buffer = bytearray()
+
+
+class LocalFileWriter(ObjectWriter):
+    """
+    Local stand-in for S3MultipartWriter, to run and test pipelines without S3
+    """
+
+    def __init__(self, uri: str, encoding: str = "utf-8"):
+        super().__init__(uri, encoding)
+        self._file = open(uri, "wb")
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def _finalize(self) -> None:
+        self._file.close()
+
+    def _abort(self) -> None:
+        self._file.close()
+        os.remove(self.uri)
+
+
+class ParquetWriter(ObjectWriter):
+    """
+    Convert tab-separated rows written to it into a Parquet object, which is
+    streamed to S3 or a local file a row group at a time. The first row written
+    must be a header with the column names of the schema. Values are parsed with
+    the converter of their column, or kept as strings.
+
+    Requires the optional pyarrow dependency (pip install datapump[parquet]).
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        schema: "pa.Schema",
+        converters: Optional[Dict[str, Callable[[str], Any]]] = None,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        encoding: str = "utf-8",
+    ):
+        if pq is None:
+            raise ImportError("pyarrow is required to write Parquet files")
+
+        super().__init__(uri, encoding)
+        self._schema: "pa.Schema" = schema
+        self._converters: Dict[str, Callable[[str], Any]] = converters or dict()
+        self._row_group_size: int = row_group_size
+        self._header: Optional[List[str]] = None
+        self._pending: bytes = b""
+        self._columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        self._row_count: int = 0
+
+        self._target: ObjectWriter = open_writer(uri)
+        self._writer = pq.ParquetWriter(self._target, schema, compression="snappy")
+
+    def _write(self, data: bytes) -> None:
+        # rows may be split across writes, so keep the last partial line around
+        lines: List[bytes] = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+
+        for line in lines:
+            if line:
+                self._write_row(line.decode(self._encoding).split("\t"))
+
+    def _write_row(self, values: List[str]) -> None:
+        if self._header is None:
+            if sorted(values) != sorted(self._schema.names):
+                raise ValueError(
+                    f"Header {values} doesn't match columns {self._schema.names} of {self.uri}"
+                )
+            self._header = values
+            return
+
+        for name, value in zip(self._header, values):
+            self._columns[name].append(self._converters.get(name, str)(value))
+
+        self._row_count += 1
+        if self._row_count >= self._row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self) -> None:
+        if self._row_count:
+            self._writer.write_table(
+                pa.Table.from_pydict(self._columns, schema=self._schema)
+            )
+            self._columns = {name: [] for name in self._schema.names}
+            self._row_count = 0
+
+    def _finalize(self) -> None:
+        if self._pending:
+            self._write(b"\n")
+
+        self._write_row_group()
+        self._writer.close()
+        self._target.close()
+
+    def _abort(self) -> None:
+        self._target.abort()
+
+
+class TeeWriter(ObjectWriter):
+    """
+    Write the same data to several writers, which are finalized or aborted
+    together
+    """
+
+    def __init__(self, writers: List[ObjectWriter], encoding: str = "utf-8"):
+        super().__init__(writers[0].uri, encoding)
+        self._writers: List[ObjectWriter] = writers
+
+    def _write(self, data: bytes) -> None:
+        for writer in self._writers:
+            writer.write(data)
+
+    def _finalize(self) -> None:
+        for writer in self._writers:
+            writer.close()
+
+    def _abort(self) -> None:
+        for writer in self._writers:
+            writer.abort()
+
+
+def open_writer(uri: str, **kwargs) -> ObjectWriter:
+    """
+    Open a streaming writer for S3 URIs, or for local paths
+    """
+    if uri.startswith("s3://"):
+        return S3MultipartWriter(uri, **kwargs)
+    else:
+        return LocalFileWriter(uri, **kwargs)
@@ -2,7 +2,7 @@ import json
 import pprint
 import traceback
 from pprint import pformat
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 from uuid import uuid1
 
 from pydantic import parse_obj_as
@@ -11,17 +11,21 @@ from pydantic.error_wrappers import ValidationError
 from datapump.clients.data_api import DataApiClient
 from datapump.clients.datapump_store import DatapumpStore
 from datapump.commands.analysis import FIRES_ANALYSES, AnalysisCommand
+from datapump.commands.compact import CompactCommand
 from datapump.commands.continue_jobs import ContinueJobsCommand
 from datapump.commands.set_latest import SetLatestCommand
+from datapump.commands.sweep_tile_cache import SweepTileCacheCommand
 from datapump.commands.sync import SyncCommand
 from datapump.commands.version_update import RasterVersionUpdateCommand
 from datapump.globals import LOGGER
 from datapump.jobs.geotrellis import FireAlertsGeotrellisJob, GeotrellisJob
 from datapump.jobs.jobs import Job, JobStatus
 from datapump.jobs.version_update import RasterVersionUpdateJob
+from datapump.sync.nrt_compaction import compact_nrt_alerts
 from datapump.sync.sync import Syncer
+from datapump.sync.tile_cache import sweep_tile_cache
 from datapump.util.slack import slack_webhook
-from datapump.util.util import log_and_notify_error
+from datapump.util.util import Deadline, log_and_notify_error
 
 
 def handler(event, context):
@@ -33,6 +37,8 @@ def handler(event, context):
                 SyncCommand,
                 ContinueJobsCommand,
                 SetLatestCommand,
+                CompactCommand,
+                SweepTileCacheCommand,
             ],
             event,
         )
@@ -46,6 +52,7 @@ def handler(event, context):
         raise e
 
     jobs: List[Job] = []
+    tiling_chunks: List[Dict[str, Any]] = []
 
     try:
         client = DataApiClient()
@@ -54,13 +61,27 @@ def handler(event, context):
         elif isinstance(command, RasterVersionUpdateCommand):
             jobs += _raster_version_update(command)
         elif isinstance(command, SyncCommand):
-            jobs += _sync(command)
+            deadline = Deadline.from_context(context)
+            sync_jobs, tiling_chunks = _sync(command, deadline)
+            jobs += sync_jobs
         elif isinstance(command, ContinueJobsCommand):
             jobs += command.parameters.dict()["jobs"]
         elif isinstance(command, SetLatestCommand):
             _set_latest(command, client)
+        elif isinstance(command, CompactCommand):
+            _compact(command, Deadline.from_context(context))
+        elif isinstance(command, SweepTileCacheCommand):
+            sweep_tile_cache(
+                command.parameters.ttl_days, Deadline.from_context(context)
+            )
 
         LOGGER.info(f"Dispatching jobs:\n{pformat(jobs)}")
+        if tiling_chunks:
+            # geostores staged for the tiler, which writes the feature files
+            # of RW area jobs before they run
+            LOGGER.info(f"Dispatching {len(tiling_chunks)} geostore chunks to tile")
+            return {"jobs": jobs, "tiling": {"chunks": tiling_chunks}}
+
         return {"jobs": jobs}
     except Exception as e:
         log_and_notify_error(
@@ -118,9 +139,11 @@ def _raster_version_update(command: RasterVersionUpdateCommand):
     return [job.dict()]
 
 
-def _sync(command: SyncCommand):
+def _sync(command: SyncCommand, deadline: Optional[Deadline] = None):
     jobs = []
-    syncer = Syncer(command.parameters.types, command.parameters.sync_version)
+    syncer = Syncer(
+        command.parameters.types, command.parameters.sync_version, deadline
+    )
     config_client = DatapumpStore()
 
     for sync_type in command.parameters.types:
@@ -137,7 +160,7 @@ def _sync(command: SyncCommand):
             if syncer_jobs:
                 jobs += [job.dict() for job in syncer_jobs]
 
-    return jobs
+    return jobs, syncer.get_tiling_chunks()
 
 
 def _set_latest(command: SetLatestCommand, data_api_client: DataApiClient):
@@ -152,3 +175,10 @@ def _set_latest(command: SetLatestCommand, data_api_client: DataApiClient):
 
         for ds in analysis_datasets:
             data_api_client.set_latest(ds, row.analysis_version)
+
+
+def _compact(command: CompactCommand, deadline: Optional[Deadline] = None):
+    for alert_type in command.parameters.alert_types:
+        compact_nrt_alerts(
+            alert_type.value, command.parameters.period.value, deadline
+        )
@@ -1,6 +1,7 @@
 import traceback
+from collections import defaultdict
 from pprint import pformat
-from typing import List, Union
+from typing import Dict, List, Union
 
 from datapump.clients.aws import get_s3_client, get_s3_path_parts
 from datapump.clients.datapump_store import DatapumpConfig, DatapumpStore
@@ -11,7 +12,7 @@ from datapump.globals import GLOBALS, LOGGER
 from datapump.jobs.geotrellis import FireAlertsGeotrellisJob, GeotrellisJob
 from datapump.jobs.jobs import Job, JobStatus
 from datapump.jobs.version_update import RasterVersionUpdateJob
-from datapump.sync.rw_areas import get_aoi_geostore_ids
+from datapump.sync.manifests import get_aoi_geostore_ids, get_sidecar_uris
 from datapump.util.util import log_and_notify_error
 from pydantic import parse_obj_as
 
@@ -93,27 +94,50 @@ def handler(event, context):
                     )
                 )
 
+    status_errors = _postprocess_rw_area_shards(rw_area_jobs)
+
     if failed_jobs:
         msg = "The following jobs failed: "
         for job in failed_jobs:
             msg += pformat(job.dict())
 
-        if rw_area_jobs:
-            # delete AOI tsv file to rollback from failed update
-            LOGGER.info(f"Rolling back AOI input file: {rw_area_jobs[0].features_1x1}")
-            bucket, key = get_s3_path_parts(rw_area_jobs[0].features_1x1)
-            get_s3_client().delete_object(Bucket=bucket, Key=key)
-
         log_and_notify_error(msg)
         raise Exception("One or more jobs failed. See logs for details.")
 
-    if rw_area_jobs and GLOBALS.env == "production":
-        try:
-            # update AOIs on RW but only on production
-            geostore_ids = get_aoi_geostore_ids(rw_area_jobs[0].features_1x1)
-            update_area_statuses(geostore_ids, "saved")
-        except Exception:
-            log_and_notify_error(
-                f"Exception while trying to update user area statuses: {traceback.format_exc()}"
-            )
-            raise Exception("One or more jobs failed. See logs for details.")
+    if status_errors:
+        raise Exception("One or more jobs failed. See logs for details.")
+
+
+def _postprocess_rw_area_shards(rw_area_jobs: List[GeotrellisJob]) -> bool:
+    """
+    RW areas are split into shards with a feature file each, so every shard
+    is rolled back or marked as saved on its own. Returns whether any status
+    update failed.
+    """
+    rw_area_shards: Dict[str, List[GeotrellisJob]] = defaultdict(list)
+    for job in rw_area_jobs:
+        rw_area_shards[job.features_1x1].append(job)
+
+    status_errors = False
+    for features_1x1, shard_jobs in rw_area_shards.items():
+        if any(job.status == JobStatus.failed for job in shard_jobs):
+            # delete AOI tsv file to rollback from failed update
+            LOGGER.info(f"Rolling back AOI input file: {features_1x1}")
+            for uri in [features_1x1] + get_sidecar_uris(features_1x1):
+                bucket, key = get_s3_path_parts(uri)
+                get_s3_client().delete_object(Bucket=bucket, Key=key)
+        elif (
+            all(job.status == JobStatus.complete for job in shard_jobs)
+            and GLOBALS.env == "production"
+        ):
+            try:
+                # update AOIs on RW but only on production
+                geostore_ids = get_aoi_geostore_ids(features_1x1)
+                update_area_statuses(geostore_ids, "saved")
+            except Exception:
+                status_errors = True
+                log_and_notify_error(
+                    f"Exception while trying to update user area statuses of {features_1x1}: {traceback.format_exc()}"
+                )
+
+    return status_errors
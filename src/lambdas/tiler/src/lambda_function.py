@@ -0,0 +1,50 @@
+import traceback
+from pprint import pformat
+from typing import Any, Dict, List, Optional, Set
+
+from datapump.globals import LOGGER
+from datapump.sync.rw_areas import merge_geostore_chunks, tile_geostore_chunk
+from datapump.util.util import Deadline, log_and_notify_error
+
+
+def handler(event, context):
+    action = event["action"]
+
+    if action == "tile":
+        return _tile(event["chunk"], Deadline.from_context(context))
+    elif action == "merge":
+        return _merge(event["jobs"], event["tiling"]["chunks"])
+    else:
+        raise ValueError(f"Unknown tiler action: {action}")
+
+
+def _tile(chunk: Dict[str, Any], deadline: Optional[Deadline]) -> Dict[str, Any]:
+    LOGGER.info(f"Tiling geostore chunk: {pformat(chunk)}")
+
+    try:
+        return tile_geostore_chunk(chunk, deadline)
+    except Exception:
+        # skip the rest of the chunk, keeping parts tiled by previous
+        # invocations. Its other areas stay pending until the next run.
+        log_and_notify_error(
+            f"Exception while tiling geostore chunk {chunk['geostores']}: {traceback.format_exc()}"
+        )
+        failed_chunk = {**chunk, "count": chunk.get("count", 0)}
+        failed_chunk.pop("checkpoint", None)
+        return failed_chunk
+
+
+def _merge(jobs: List[Dict[str, Any]], chunks: List[Dict[str, Any]]):
+    LOGGER.info(f"Merging {len(chunks)} tiled geostore chunks")
+
+    staged: Set[str] = {chunk["features_1x1"] for chunk in chunks}
+    merged: List[str] = merge_geostore_chunks(chunks)
+
+    # drop jobs of shards where no geostore could be tiled
+    return {
+        "jobs": [
+            job
+            for job in jobs
+            if job.get("features_1x1") not in staged or job["features_1x1"] in merged
+        ]
+    }
@@ -12,8 +12,8 @@ setup(
         "requests~=2.31.0",
         "geojson~=3.0.1",
         "google-cloud-storage~=2.10.0",
-        "pyshp~=2.3.1",
         "pydantic~=1.10.11",
         "retry~=0.9.2",
     ],  # noqa: E231
+    extras_require={"parquet": ["pyarrow~=14.0.2"]},
 )
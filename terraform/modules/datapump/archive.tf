@@ -15,3 +15,9 @@ data "archive_file" "lambda_postprocessor" {
   source_dir  = "${var.lambdas_path}/postprocessor/src"
   output_path = "${var.lambdas_path}/postprocessor/lambda.zip"
 }
+
+data "archive_file" "lambda_tiler" {
+  type        = "zip"
+  source_dir  = "${var.lambdas_path}/tiler/src"
+  output_path = "${var.lambdas_path}/tiler/lambda.zip"
+}
@@ -29,6 +29,13 @@ resource "aws_cloudwatch_event_rule" "everyday-3-am-est" {
   tags                = local.tags
 }
 
+resource "aws_cloudwatch_event_rule" "everyday-5-pm-est" {
+  name                = substr("everyday-5-pm-est${local.name_suffix}", 0, 64)
+  description         = "Run everyday at 5 pm EST"
+  schedule_expression = "cron(0 1 ? * * *)"
+  tags                = local.tags
+}
+
 resource "aws_cloudwatch_event_rule" "everyday-1-pm-est" {
   name                = substr("everyday-1-pm-est${local.name_suffix}", 0, 64)
   description         = "Run everyday at 1 pm EST"
@@ -83,6 +90,28 @@ resource "aws_cloudwatch_event_target" "sync-modis" {
   count     = var.environment == "production" ? 1 : 0
 }
 
+# Compact NRT fire alerts once the fire analyses of the fires and areas syncs,
+# which can run for up to 12 hours, are done. Compaction also skips alert types
+# with an analysis still running.
+resource "aws_cloudwatch_event_target" "compact-fire-alerts" {
+  rule      = aws_cloudwatch_event_rule.everyday-5-pm-est.name
+  target_id = substr("${local.project}-compact-fire-alerts${local.name_suffix}", 0, 64)
+  arn       = aws_sfn_state_machine.datapump.id
+  input    = "{\"command\": \"compact\", \"parameters\": {\"alert_types\": [\"viirs\", \"modis\"], \"period\": \"day\"}}"
+  role_arn  = aws_iam_role.datapump_states.arn
+  count     = var.environment == "production" ? 1 : 0
+}
+
+# Delete expired entries of the RW areas tile cache, outside of the areas sync
+resource "aws_cloudwatch_event_target" "sweep-tile-cache" {
+  rule      = aws_cloudwatch_event_rule.everyday-5-pm-est.name
+  target_id = substr("${local.project}-sweep-tile-cache${local.name_suffix}", 0, 64)
+  arn       = aws_sfn_state_machine.datapump.id
+  input    = "{\"command\": \"sweep_tile_cache\", \"parameters\": {}}"
+  role_arn  = aws_iam_role.datapump_states.arn
+  count     = var.environment == "production" ? 1 : 0
+}
+
 resource "aws_cloudwatch_event_target" "sync-integrated-alerts" {
   rule      = aws_cloudwatch_event_rule.everyday-3-am-est.name
   target_id = substr("${local.project}-sync-integrated-alerts${local.name_suffix}", 0, 64)
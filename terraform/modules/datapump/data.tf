@@ -16,7 +16,9 @@ data "template_file" "sfn_datapump" {
     lambda_dispatcher_arn = aws_lambda_function.dispatcher.arn,
     lambda_executor_arn = aws_lambda_function.executor.arn,
     lambda_postprocessor_arn = aws_lambda_function.postprocessor.arn,
-    wait_time = var.sfn_wait_time
+    lambda_tiler_arn = aws_lambda_function.tiler.arn,
+    wait_time = var.sfn_wait_time,
+    tiling_max_concurrency = var.tiling_max_concurrency
   }
 }
 
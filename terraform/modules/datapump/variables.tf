@@ -103,6 +103,12 @@ variable "shapely_lambda_layer_arn" {
   description = "ARN of the shapely lambda layer"
 }
 
+variable "pyarrow_lambda_layer_arn" {
+  type        = string
+  default     = ""
+  description = "ARN of the pyarrow lambda layer, only needed to write Parquet feature files"
+}
+
 variable "glad_path" {
   type        = string
   description = "S3 path to GLAD data"
@@ -130,4 +136,27 @@ variable "read_gfw_sync_secrets_policy" {
   type        = string
   default     = ""
   description = "ARN to policy to read gfw sync secrets"
-}
\ No newline at end of file
+}
+variable "rw_areas_distributed_tiling" {
+  type        = bool
+  default     = false
+  description = "Tile RW areas in parallel with the tiler Lambda instead of in the dispatcher"
+}
+
+variable "tiling_max_concurrency" {
+  type        = number
+  default     = 20
+  description = "Max number of tiler Lambdas to run in parallel"
+}
+
+variable "rw_areas_grid_size" {
+  type        = number
+  default     = 1
+  description = "Size in degrees of the grid cells RW areas are tiled into"
+}
+
+variable "rw_areas_feature_format" {
+  type        = string
+  default     = "tsv"
+  description = "Format of RW areas feature files, tsv or parquet"
+}
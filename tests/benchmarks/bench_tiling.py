@@ -0,0 +1,288 @@
+"""
+Offline benchmarks of the hot path of RW areas tiling: fetching the extent
+grid, filtering geostores, clipping tiles and converting geostores to WKB.
+
+Runs against a generated local extent fixture and synthetic geostores, without
+any AWS or RW API access. Reports latency percentiles per geostore, rows
+emitted and peak memory per shape class, and can compare against the JSON
+report of a previous run to catch regressions.
+
+    python tests/benchmarks/bench_tiling.py --count 20 --json report.json
+    python tests/benchmarks/bench_tiling.py --compare report.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+os.environ.setdefault("S3_BUCKET_PIPELINE", "gfw-pipelines-benchmark")
+os.environ.setdefault("S3_BUCKET_DATA_LAKE", "gfw-data-lake-benchmark")
+
+import datapump.sync.rw_areas as rw_areas  # noqa: E402
+import numpy as np  # noqa: E402
+from datapump.globals import GLOBALS, LOGGER  # noqa: E402
+from datapump.sync.tiling import _get_intersecting_polygon  # noqa: E402
+from geostores import SHAPES, generate_geostores, write_extent_fixture  # noqa: E402
+from shapely.geometry import shape  # noqa: E402
+
+PERCENTILES = [50, 90, 99]
+
+# complex geostores take orders of magnitude longer to tile than the others
+COUNT_FACTORS = {"complex": 0.2}
+
+# differences below this many ms or MB are noise, not regressions
+MIN_REGRESSION = 1.0
+
+
+class LocalS3Client:
+    """
+    Serves the extent fixture from disk in place of the pipeline bucket
+    """
+
+    def __init__(self, extent_path: str):
+        self.extent_path = extent_path
+        with open(extent_path, "rb") as f:
+            self.etag = hashlib.md5(f.read()).hexdigest()
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": f'"{self.etag}"'}
+
+    def get_object(self, Bucket, Key, IfMatch=None):
+        return {"Body": open(self.extent_path, "rb")}
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Percentiles and max of latencies in milliseconds
+    """
+    if not samples:
+        return {}
+
+    values = np.array(samples) * 1000
+    summary = {f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary["max_ms"] = float(values.max())
+    return summary
+
+
+@contextmanager
+def peak_memory() -> Iterator[Dict[str, float]]:
+    """
+    Peak memory of Python allocations within the block, in MB. Allocations made
+    by GEOS aren't traced, see the max RSS of the process for those.
+    """
+    result: Dict[str, float] = dict()
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = peak / 1024 / 1024
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_extent(temp_dir: str) -> Dict[str, Any]:
+    """
+    Load the extent grid from the GeoJSON fixture, from the /tmp cache and
+    from the in-memory cache of warm containers
+    """
+    for name in os.listdir(temp_dir):
+        if name.endswith(".npz"):
+            os.remove(os.path.join(temp_dir, name))
+
+    rw_areas._EXTENT_1X1_CACHE.clear()
+    cold = timed(rw_areas._get_extent_1x1)
+    rw_areas._EXTENT_1X1_CACHE.clear()
+    disk = timed(rw_areas._get_extent_1x1)
+    memory = timed(rw_areas._get_extent_1x1)
+
+    return {
+        "cold_ms": cold * 1000,
+        "disk_cache_ms": disk * 1000,
+        "memory_cache_ms": memory * 1000,
+    }
+
+
+def bench_filter(geostores: List[Dict[str, Any]]) -> Dict[str, Any]:
+    elapsed = timed(lambda: rw_areas.filter_geostores({"data": geostores}))
+    return {"geostores": len(geostores), "total_ms": elapsed * 1000}
+
+
+def bench_intersections(geostores: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Clip each geometry to every tile the bounds of its parts overlap
+    """
+    extent_1x1 = rw_areas._get_grid(GLOBALS.rw_areas_grid_size)
+    samples: List[float] = []
+
+    for g in geostores:
+        geom = shape(_get_geometry(g))
+        for tile, _, _ in extent_1x1.candidates(geom):
+            samples.append(timed(lambda: _get_intersecting_polygon(geom, tile)))
+
+    return {"calls": len(samples), **summarize(samples)}
+
+
+def bench_geostore_to_wkb(geostores: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Tile geostores one at a time, then all at once under tracemalloc for the
+    peak memory
+    """
+    samples: List[float] = []
+    rows = 0
+
+    for g in geostores:
+        start = time.perf_counter()
+        with rw_areas.geostore_to_wkb({"data": [g]}) as (_, count):
+            samples.append(time.perf_counter() - start)
+            rows += count
+
+    with peak_memory() as memory:
+        with rw_areas.geostore_to_wkb({"data": geostores}):
+            pass
+
+    return {
+        "geostores": len(geostores),
+        "rows": rows,
+        **summarize(samples),
+        **memory,
+    }
+
+
+def run(count: int, seed: int, shapes: List[str]) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp(prefix="datapump-benchmark-")
+    extent_path = os.path.join(temp_dir, "extent_1x1.geojson")
+    write_extent_fixture(extent_path)
+
+    client = LocalS3Client(extent_path)
+    rw_areas.get_s3_client = lambda: client
+    rw_areas.update_area_statuses = lambda ids, status: 200
+    rw_areas.TEMP_DIR = temp_dir
+
+    # measure tiling itself, single process and without the tile cache
+    GLOBALS.rw_areas_tiling_processes = 1
+    GLOBALS.rw_areas_tile_cache = False
+
+    report: Dict[str, Any] = {
+        "seed": seed,
+        "count": count,
+        "extent": bench_extent(temp_dir),
+        "filter_geostores": {},
+        "intersections": {},
+        "geostore_to_wkb": {},
+    }
+
+    for name in shapes:
+        n = max(1, round(count * COUNT_FACTORS.get(name, 1)))
+        geostores = list(generate_geostores(name, n, seed))
+
+        report["filter_geostores"][name] = bench_filter(geostores)
+        report["intersections"][name] = bench_intersections(geostores)
+        report["geostore_to_wkb"][name] = bench_geostore_to_wkb(geostores)
+
+    # ru_maxrss is in KB on Linux
+    report["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return report
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Latencies and peak memory of the report that exceed the baseline by more
+    than the threshold factor, and by at least MIN_REGRESSION
+    """
+    regressions: List[str] = []
+
+    for section in ("intersections", "geostore_to_wkb"):
+        for name, stats in report[section].items():
+            base = baseline.get(section, {}).get(name, {})
+            for key, value in stats.items():
+                if not key.endswith(("_ms", "_mb")) or not base.get(key):
+                    continue
+                if (
+                    value > base[key] * threshold
+                    and value - base[key] >= MIN_REGRESSION
+                ):
+                    regressions.append(
+                        f"{section}/{name} {key}: {value:.2f} vs {base[key]:.2f}"
+                    )
+
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"extent: {_format(report['extent'])}")
+    for section in ("filter_geostores", "intersections", "geostore_to_wkb"):
+        print(f"{section}:")
+        for name, stats in report[section].items():
+            print(f"  {name:<14}{_format(stats)}")
+    print(f"max RSS: {report['max_rss_mb']:.1f} MB")
+
+
+def _format(stats: Dict[str, Any]) -> str:
+    return "  ".join(
+        f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in stats.items()
+    )
+
+
+def _get_geometry(g: Dict[str, Any]) -> Dict[str, Any]:
+    return g["geostore"]["data"]["attributes"]["geojson"]["features"][0]["geometry"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=20, help="geostores per shape")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--shapes", nargs="+", choices=list(SHAPES.keys()), default=list(SHAPES)
+    )
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--log", action="store_true", help="show datapump logs")
+    parser.add_argument("--compare", help="report of a previous run to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="factor over the baseline that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.log:
+        LOGGER.setLevel(logging.WARNING)
+
+    report = run(args.count, args.seed, args.shapes)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Synthetic geostores and extent grid for the tiling benchmarks.
+
+Everything is generated from a seed, so runs with the same seed and counts
+tile exactly the same geometries.
+"""
+import json
+import math
+import random
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from shapely.geometry import MultiPolygon, Polygon, mapping
+
+# approximate hectares per square degree at the equator
+HA_PER_SQ_DEGREE = 1_236_000
+
+
+def star_polygon(
+    rng: random.Random,
+    center: Tuple[float, float],
+    radius: float,
+    vertices: int,
+    roughness: float = 0.2,
+    holes: int = 0,
+) -> Polygon:
+    """
+    Star-shaped polygon with vertices at increasing angles around the center,
+    so it's always valid however rough its boundary is. Holes are placed well
+    inside the smallest radius of the boundary.
+    """
+    x, y = center
+    shell: List[Tuple[float, float]] = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        r = radius * (1 - roughness * rng.random())
+        shell.append((x + r * math.cos(angle), y + r * math.sin(angle)))
+
+    interiors: List[List[Tuple[float, float]]] = []
+    inner_radius = radius * (1 - roughness) / 2
+    for i in range(holes):
+        angle = 2 * math.pi * i / holes
+        hole_radius = inner_radius * min(0.5, math.pi / holes) / 2
+        hole_x = x + inner_radius * math.cos(angle)
+        hole_y = y + inner_radius * math.sin(angle)
+        interiors.append(
+            [
+                (
+                    hole_x + hole_radius * math.cos(2 * math.pi * k / 16),
+                    hole_y + hole_radius * math.sin(2 * math.pi * k / 16),
+                )
+                for k in range(16)
+            ]
+        )
+
+    return Polygon(shell, interiors)
+
+
+def small(rng: random.Random) -> Polygon:
+    return star_polygon(
+        rng, _random_center(rng), rng.uniform(0.01, 0.1), rng.randint(20, 100)
+    )
+
+
+def country(rng: random.Random) -> Polygon:
+    return star_polygon(
+        rng, _random_center(rng), rng.uniform(3, 8), rng.randint(1000, 3000), 0.1
+    )
+
+
+def multipolygon(rng: random.Random) -> MultiPolygon:
+    x, y = _random_center(rng)
+    parts: List[Polygon] = []
+    for i in range(rng.randint(5, 30)):
+        # islands along a diagonal, far enough apart to never overlap
+        center = (x + i * 0.5, y + rng.uniform(-2, 2))
+        parts.append(star_polygon(rng, center, rng.uniform(0.02, 0.2), 50))
+
+    return MultiPolygon(parts)
+
+
+def complex_polygon(rng: random.Random) -> Polygon:
+    return star_polygon(
+        rng,
+        _random_center(rng),
+        rng.uniform(1, 2),
+        rng.randint(5_000, 20_000),
+        0.3,
+        holes=rng.randint(0, 20),
+    )
+
+
+def antimeridian(rng: random.Random) -> MultiPolygon:
+    """
+    Polygon centered on the antimeridian, split at +/-180 into a multipolygon
+    as RFC 7946 recommends
+    """
+    geom = star_polygon(
+        rng, (180, rng.uniform(-60, 60)), rng.uniform(0.5, 3), rng.randint(100, 500)
+    )
+    east = geom.intersection(Polygon([(180, -90), (360, -90), (360, 90), (180, 90)]))
+    west = geom.intersection(Polygon([(0, -90), (180, -90), (180, 90), (0, 90)]))
+    east = Polygon(
+        [(px - 360, py) for px, py in east.exterior.coords],
+    )
+
+    return MultiPolygon([west, east])
+
+
+SHAPES: Dict[str, Callable[[random.Random], Any]] = {
+    "small": small,
+    "country": country,
+    "multipolygon": multipolygon,
+    "complex": complex_polygon,
+    "antimeridian": antimeridian,
+}
+
+
+def generate_geostores(
+    shape: str, count: int, seed: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generate geostores of a shape class, in the format returned by the RW API
+    """
+    rng = random.Random(f"{seed}-{shape}")
+    for i in range(count):
+        geom = SHAPES[shape](rng)
+        yield to_geostore(f"{shape}-{i:04d}-{seed}", geom)
+
+
+def to_geostore(geostore_id: str, geom) -> Dict[str, Any]:
+    return {
+        "geostoreId": geostore_id,
+        "geostore": {
+            "data": {
+                "attributes": {
+                    "areaHa": geom.area * HA_PER_SQ_DEGREE,
+                    "geojson": {
+                        "features": [{"geometry": mapping(geom), "properties": {}}]
+                    },
+                }
+            }
+        },
+    }
+
+
+def write_extent_fixture(path: str) -> None:
+    """
+    Write a global 1x1 degree extent file with deterministic tcl/glad flags
+    """
+    features = [
+        {
+            "type": "Feature",
+            "geometry": mapping(
+                Polygon(
+                    [
+                        (col, row),
+                        (col + 1, row),
+                        (col + 1, row + 1),
+                        (col, row + 1),
+                    ]
+                )
+            ),
+            "properties": {"tcl": (col + row) % 3 != 0, "glad": -30 <= row < 30},
+        }
+        for col in range(-180, 180)
+        for row in range(-90, 90)
+    ]
+
+    with open(path, "w") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def _random_center(rng: random.Random) -> Tuple[float, float]:
+    return rng.uniform(-170, 160), rng.uniform(-50, 60)
@@ -1,21 +1,43 @@
 #############
 ## Test some specific code paths without having to test the entire step function
 #############
+import gzip
+import io
+import json
+import math
 import os
+import struct
+import subprocess
+import sys
 import time
-from datetime import date, datetime, timedelta
+import zipfile
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
 from typing import List
 
 import pytest
+import shapefile
+from shapely.geometry import MultiPolygon, Point, Polygon, box, mapping
+from shapely.wkb import dumps, loads
 
 os.environ["S3_BUCKET_PIPELINE"] = "gfw-pipelines-test"
 os.environ["S3_BUCKET_DATA_LAKE"] = "gfw-data-lake-test"
 os.environ["GEOTRELLIS_JAR_PATH"] = "s3://gfw-pipelines-test/geotrellis/jars"
 
+import datapump.clients.rw_api as rw_api
+import datapump.jobs.geotrellis as geotrellis
+import datapump.sync.manifests as manifests
+import datapump.sync.fire_alerts as fire_alerts
+import datapump.sync.nrt_compaction as nrt_compaction
+import datapump.sync.rw_areas as rw_areas
 import datapump.sync.sync as sync
+import datapump.sync.tile_cache as tile_cache
+import datapump.util.writers as writers
+from datapump.clients.data_api import DataApiClient
 from datapump.clients.datapump_store import DatapumpConfig
 from datapump.commands.analysis import Analysis, AnalysisInputTable
 from datapump.commands.sync import SyncType
+from datapump.globals import GLOBALS
 from datapump.jobs.geotrellis import (
     FireAlertsGeotrellisJob,
     GeotrellisJob,
@@ -28,7 +50,20 @@ from datapump.sync.sync import (
     GLADLAlertsSync,
     GLADS2AlertsSync,
     RADDAlertsSync,
+    RWAreasSync,
 )
+from datapump.sync.tiling import (
+    TileClass,
+    TileGrid,
+    classify_tiles,
+    count_vertices,
+    get_repair_reason,
+    normalize_polygon,
+    repair_geometry,
+    tile_geometry,
+)
+from datapump.util.util import Deadline
+from datapump.util.writers import MIN_PART_SIZE
 
 
 def test_geotrellis_fires():
@@ -122,6 +157,43 @@ def test_geotrellis_retries(monkeypatch):
     assert test.status == JobStatus.failed
 
 
+def test_rw_areas_shard_result_paths(monkeypatch):
+    shards = [
+        "s3://gfw-pipelines-test/geotrellis/features/geostore/vtest_0.tsv",
+        "s3://gfw-pipelines-test/geotrellis/features/geostore/vtest_1.tsv",
+    ]
+    monkeypatch.setattr(GLOBALS, "rw_areas_distributed_tiling", False)
+    monkeypatch.setattr(sync, "create_1x1_tsv", lambda version, deadline: list(shards))
+    config = DatapumpConfig(
+        analysis_version="v20220101",
+        dataset="geostore",
+        dataset_version="v20220101",
+        analysis="tcl",
+        sync=True,
+        sync_type=SyncType.rw_areas,
+        metadata={"geotrellis_version": "1.3.0"},
+    )
+
+    jobs = RWAreasSync("vtest").build_jobs(config)
+
+    args = [job._get_step()["HadoopJarStep"]["Args"] for job in jobs]
+    outputs = [step_args[step_args.index("--output") + 1] for step_args in args]
+    assert outputs == [
+        "s3://gfw-pipelines-test/geotrellis/results/vtest/geostore/v20220101/rw_areas/vtest_0",
+        "s3://gfw-pipelines-test/geotrellis/results/vtest/geostore/v20220101/rw_areas/vtest_1",
+    ]
+    assert len({job._get_result_path(include_analysis=True) for job in jobs}) == 2
+
+
+def test_geotrellis_imports_without_tiling_dependencies():
+    # the executor Lambda only has the datapump layer, without shapely or numpy
+    blocked = "import sys; sys.modules.update(shapely=None, numpy=None, pyarrow=None)"
+    subprocess.run(
+        [sys.executable, "-c", f"{blocked}; import datapump.jobs.geotrellis"],
+        check=True,
+    )
+
+
 def test_radd_sync_nothing_newer(monkeypatch):
     mock_dp_config = DatapumpConfig(
         analysis_version="v20220101",
@@ -523,6 +595,1135 @@ def test_glad_landsat_sync_grown_extent(monkeypatch):
         _ = GLADLAlertsSync("v20220222").build_jobs(mock_dp_config)
 
 
+def test_tile_grid_candidates():
+    grid = _mock_grid()
+
+    geom = Point(0.5, -0.5).buffer(2.2)
+    expected = [tile for tile in _all_tiles(grid) if geom.intersects(tile[0])]
+    candidates = list(grid.candidates(geom))
+
+    assert len(candidates) == 25
+    for tile in expected:
+        assert tile in candidates
+
+    # parts at both edges of the grid, like a geometry split at the antimeridian,
+    # only look up the cells of their own bounds
+    geom = MultiPolygon([box(-4.5, 0.2, -4.2, 0.4), box(4.2, 0.2, 4.5, 0.4)])
+    assert [tile[0].bounds for tile in grid.candidates(geom)] == [
+        (-5.0, 0.0, -4.0, 1.0),
+        (4.0, 0.0, 5.0, 1.0),
+    ]
+
+
+def test_tile_grid_resample():
+    grid = _mock_grid()
+
+    fine = grid.resample(0.25)
+    assert len(fine) == 16 * len(grid)
+    assert [
+        (tile[0].bounds, tile[1], tile[2])
+        for tile in fine.candidates(box(2.6, 1.1, 2.7, 1.2))
+    ] == [((2.5, 1.0, 2.75, 1.25), True, False)]
+
+    coarse = grid.resample(2)
+    assert len(coarse) == 36
+    # only cells merging the odd column/row -5 are unflagged
+    assert coarse.tcl.sum() == 30 and coarse.glad.sum() == 30
+
+    coarse = grid.resample(10)
+    assert [tile[0].bounds for tile in coarse.candidates(box(-1, -1, 1, 1))] == [
+        (-10.0, -10.0, 0.0, 0.0),
+        (-10.0, 0.0, 0.0, 10.0),
+        (0.0, -10.0, 10.0, 0.0),
+        (0.0, 0.0, 10.0, 10.0),
+    ]
+
+    with pytest.raises(ValueError):
+        grid.resample(0.3)
+
+
+def test_split_by_vertex_budget():
+    # a star with a lot of vertices concentrated in one cell
+    star = Polygon(
+        [
+            (
+                0.5 + (0.45 if i % 2 else 0.2) * math.cos(math.pi * i / 500),
+                0.5 + (0.45 if i % 2 else 0.2) * math.sin(math.pi * i / 500),
+            )
+            for i in range(1000)
+        ]
+    )
+    grid = _mock_grid()
+
+    assert len(list(tile_geometry(star, grid))) == 1
+
+    pieces = list(tile_geometry(star, grid, max_vertices=200))
+    assert len(pieces) > 4
+    assert all(count_vertices(polygon) <= 200 for polygon, _, _ in pieces)
+    assert all((tcl, glad) == (True, True) for _, tcl, glad in pieces)
+    assert math.isclose(sum(polygon.area for polygon, _, _ in pieces), star.area)
+
+
+def test_normalize_polygon():
+    # densely digitized circle with far more precision than needed
+    circle = Point(0.123456789, 0.987654321).buffer(0.3, resolution=256)
+
+    assert normalize_polygon(circle) is circle
+
+    snapped = normalize_polygon(circle, precision=0.001)
+    assert snapped.is_valid
+    assert count_vertices(snapped) < count_vertices(circle)
+    assert all(
+        math.isclose(round(c / 0.001) * 0.001, c, abs_tol=1e-9)
+        for c in snapped.exterior.coords[0]
+    )
+    assert math.isclose(snapped.area, circle.area, rel_tol=0.01)
+
+    simplified = normalize_polygon(circle, tolerance=0.001)
+    assert simplified.is_valid
+    assert count_vertices(simplified) < count_vertices(circle)
+
+    # snapping a sliver away keeps the original polygon
+    sliver = box(0, 0, 1, 0.0001)
+    assert normalize_polygon(sliver, precision=0.001) is sliver
+
+
+def test_repair_geometry():
+    stats = Counter()
+
+    # simple valid geometries skip the dilate/erode
+    rectangle = box(0, 0, 2, 1)
+    assert repair_geometry(rectangle, stats=stats) is rectangle
+    assert stats == {"fast_path": 1}
+
+    # small holes and narrow gaps between parts are closed
+    holed = Polygon(
+        box(0, 0, 1, 1).exterior.coords,
+        [box(0.5, 0.5, 0.50001, 0.50001).exterior.coords],
+    )
+    assert not repair_geometry(holed, stats=stats).interiors
+
+    close_parts = box(0, 0, 1, 1).union(box(1.00005, 0, 2, 1))
+    assert repair_geometry(close_parts, stats=stats).type == "Polygon"
+
+    bowtie = Polygon([(0, 0), (1, 1), (1, 0), (0, 1), (0, 0)])
+    assert repair_geometry(bowtie, stats=stats).is_valid
+
+    assert stats == {
+        "fast_path": 1,
+        "small_hole": 1,
+        "close_parts": 1,
+        "invalid": 1,
+    }
+
+    assert get_repair_reason(box(0, 0, 1, 0.00001)) == "sliver"
+    assert get_repair_reason(box(0, 0, 1, 1).union(box(2, 0, 3, 1))) is None
+
+
+def test_geostore_to_wkb_grid_size(monkeypatch):
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", _mock_grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+
+    geostore = {"data": [_mock_geostore("a", box(0.1, 0.1, 1.9, 0.9))]}
+
+    counts = {}
+    for grid_size in (0.5, 1, 2):
+        with rw_areas.geostore_to_wkb(geostore, grid_size=grid_size) as (_, count):
+            counts[grid_size] = count
+
+    assert counts == {0.5: 8, 1: 2, 2: 1}
+
+
+def test_tile_geometry_interior_and_boundary():
+    grid = _mock_grid()
+
+    geom = box(-2.5, -2.5, 2.5, 2.5)
+    classes = [tile_class for _, tile_class in classify_tiles(geom, grid)]
+    assert classes.count(TileClass.interior) == 16
+    assert classes.count(TileClass.boundary) == 20
+
+    polygons = [polygon for polygon, _, _ in tile_geometry(geom, grid)]
+    assert len(polygons) == 36
+    assert sum(polygon.area for polygon in polygons) == pytest.approx(geom.area)
+
+
+def test_geostore_to_wkb_multiprocess(monkeypatch):
+    grid = _mock_grid()
+
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", lambda: grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+
+    geostore = {
+        "data": [
+            _mock_geostore(f"{i:032d}", Point(i - 3, 0).buffer(0.8)) for i in range(7)
+        ]
+    }
+
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+    with rw_areas.geostore_to_wkb(geostore) as (wkb, count):
+        serial_tsv, serial_count = wkb.getvalue(), count
+
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 3)
+    with rw_areas.geostore_to_wkb(geostore) as (wkb, count):
+        assert count == serial_count
+        assert wkb.getvalue() == serial_tsv
+
+
+def test_get_geostore_blocks(monkeypatch):
+    calls = []
+
+    class MockResponse:
+        def __init__(self, status_code, data):
+            self.status_code = status_code
+            self._data = data
+
+        def json(self):
+            return {"data": self._data}
+
+    class MockSession:
+        def post(self, url, json, headers):
+            ids = json["geostores"]
+            calls.append(ids)
+
+            # fail first request of the second block once, to exercise retries
+            if ids[0] == "3" and calls.count(ids) == 1:
+                return MockResponse(500, None)
+
+            return MockResponse(200, [{"geostoreId": i} for i in reversed(ids)])
+
+    monkeypatch.setattr(rw_areas, "session", lambda: MockSession())
+    monkeypatch.setattr(rw_areas, "token", lambda: "token")
+    monkeypatch.setattr(rw_areas, "api_prefix", lambda: "staging")
+
+    ids = [str(i) for i in range(8)]
+    geostores = rw_areas.get_geostore(ids, block_size=3)
+
+    assert [g["geostoreId"] for g in geostores["data"]] == ids
+    assert len(calls) == 4
+
+
+def test_get_pending_areas_pages(monkeypatch):
+    areas = [{"id": str(i)} for i in range(11)]
+    page_size = 3
+    last_page = 4
+
+    class MockResponse:
+        status_code = 200
+
+        def __init__(self, data):
+            self._data = data
+
+        def json(self):
+            return self._data
+
+    class MockSession:
+        def get(self, url, headers):
+            page = int(url.split("page[number]=")[1].split("&")[0])
+            link = "/v2/area?page[number]={}&page[size]=3"
+            return MockResponse(
+                {
+                    "data": areas[(page - 1) * page_size : page * page_size],
+                    "links": {
+                        "self": link.format(page),
+                        "last": link.format(last_page),
+                    },
+                }
+            )
+
+    monkeypatch.setattr(rw_areas, "session", lambda: MockSession())
+    monkeypatch.setattr(rw_areas, "token", lambda: "token")
+    monkeypatch.setattr(rw_areas, "api_prefix", lambda: "staging")
+    monkeypatch.setattr(
+        rw_areas.requests, "post", lambda url, headers: MockResponse(None)
+    )
+    monkeypatch.setattr(GLOBALS, "rw_areas_page_size", page_size)
+
+    assert rw_areas.get_pending_areas() == areas
+
+
+def test_update_area_statuses_batches(monkeypatch):
+    calls = []
+    warnings = []
+
+    class MockResponse:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    class MockSession:
+        def post(self, url, json, headers):
+            calls.append(json["geostores"])
+            return MockResponse(404 if "bad" in json["geostores"] else 200)
+
+    monkeypatch.setattr(rw_api, "session", lambda: MockSession())
+    monkeypatch.setattr(rw_api, "token", lambda: "token")
+    monkeypatch.setattr(rw_api, "api_prefix", lambda: "staging")
+    monkeypatch.setattr(rw_api, "slack_webhook", lambda *args: warnings.append(args))
+    monkeypatch.setattr(GLOBALS, "rw_api_max_requests_per_second", 1000)
+
+    ids = [str(i) for i in range(10)]
+    rw_api.update_area_statuses(ids, "saved", batch_size=4)
+    assert sorted(len(batch) for batch in calls) == [2, 4, 4]
+    assert not warnings
+
+    calls.clear()
+    rw_api.update_area_statuses(ids[:3] + ["bad"], "saved", batch_size=4)
+    assert len(calls) == 5
+    assert len(warnings) == 1
+
+
+def test_extent_1x1_cache(monkeypatch, tmp_path):
+    extent = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": mapping(tile),
+                "properties": {"tcl": tcl, "glad": glad},
+            }
+            for tile, tcl, glad in _all_tiles(_mock_grid())
+        ],
+    }
+
+    class MockS3Client:
+        downloads = 0
+
+        def head_object(self, **kwargs):
+            return {"ETag": '"abc123"'}
+
+        def get_object(self, **kwargs):
+            self.downloads += 1
+            return {"Body": io.BytesIO(json.dumps(extent).encode())}
+
+    s3_client = MockS3Client()
+    monkeypatch.setattr(rw_areas, "get_s3_client", lambda: s3_client)
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: s3_client)
+    monkeypatch.setattr(rw_areas, "TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(rw_areas, "_EXTENT_1X1_CACHE", {})
+
+    grid = rw_areas._get_extent_1x1()
+    assert len(grid) == 100
+    assert (tmp_path / "extent_1x1_abc123.npz").is_file()
+
+    # warm container uses the in-memory grid, cold container reads /tmp
+    assert rw_areas._get_extent_1x1() is grid
+    monkeypatch.setattr(rw_areas, "_EXTENT_1X1_CACHE", {})
+    cached_grid = rw_areas._get_extent_1x1()
+
+    assert s3_client.downloads == 1
+    assert list(_all_tiles(cached_grid)) == list(_all_tiles(grid))
+
+
+def test_s3_multipart_writer(monkeypatch):
+    class MockS3Client:
+        def __init__(self):
+            self.parts = []
+            self.objects = {}
+
+        def create_multipart_upload(self, **kwargs):
+            return {"UploadId": "upload"}
+
+        def upload_part(self, **kwargs):
+            self.parts.append(kwargs["Body"])
+            return {"ETag": f"etag{kwargs['PartNumber']}"}
+
+        def complete_multipart_upload(self, **kwargs):
+            assert [p["PartNumber"] for p in kwargs["MultipartUpload"]["Parts"]] == [
+                1,
+                2,
+                3,
+            ]
+            self.objects[kwargs["Key"]] = b"".join(self.parts)
+
+        def put_object(self, **kwargs):
+            self.objects[kwargs["Key"]] = kwargs["Body"]
+
+    s3_client = MockS3Client()
+    monkeypatch.setattr(writers, "get_s3_client", lambda: s3_client)
+
+    row = "a" * 1023 + "\n"
+    with writers.open_writer("s3://bucket/big.tsv", part_size=MIN_PART_SIZE) as tsv:
+        for _ in range(12 * 1024):
+            tsv.write(row)
+
+    assert len(s3_client.parts) == 3
+    assert len(s3_client.parts[0]) == MIN_PART_SIZE
+    assert s3_client.objects["big.tsv"] == row.encode() * 12 * 1024
+
+    with writers.open_writer("s3://bucket/small.tsv") as tsv:
+        tsv.write("geostore_id\tgeom\ttcl\tglad\n")
+
+    assert s3_client.objects["small.tsv"] == b"geostore_id\tgeom\ttcl\tglad\n"
+
+
+def test_create_1x1_tsv_local_writer(monkeypatch, tmp_path):
+    def mock_get_virtual_1x1_tsv(
+        tsv, geostore_ids, manifest, aliases, grid_size, deadline, pending
+    ):
+        tsv.write("geostore_id\tgeom\ttcl\tglad\n")
+        return 0
+
+    monkeypatch.setattr(
+        rw_areas,
+        "open_writer",
+        lambda uri: writers.LocalFileWriter(str(tmp_path / "out.tsv")),
+    )
+    monkeypatch.setattr(rw_areas, "get_pending_areas", lambda: [])
+    monkeypatch.setattr(rw_areas, "get_geostore_ids", lambda areas: ["1"])
+    monkeypatch.setattr(rw_areas, "get_virtual_1x1_tsv", mock_get_virtual_1x1_tsv)
+
+    assert rw_areas.create_1x1_tsv("vtest") == []
+    assert not (tmp_path / "out.tsv").exists()
+
+
+def test_no_new_user_areas_reported_once(monkeypatch, tmp_path):
+    messages = []
+    monkeypatch.setattr(rw_areas, "slack_webhook", lambda *args: messages.append(args))
+    monkeypatch.setattr(
+        rw_areas,
+        "open_writer",
+        lambda uri: writers.LocalFileWriter(str(tmp_path / os.path.basename(uri))),
+    )
+    monkeypatch.setattr(rw_areas, "get_pending_areas", lambda: [])
+    monkeypatch.setattr(rw_areas, "get_geostore_ids", lambda areas: ["1", "2", "3"])
+    monkeypatch.setattr(rw_areas, "get_geostore", lambda ids: {"data": []})
+    monkeypatch.setattr(rw_areas, "filter_geostores", lambda geostore: {})
+    monkeypatch.setattr(GLOBALS, "rw_areas_shard_size", 1)
+
+    # every shard is empty, the run is reported once
+    assert rw_areas.create_1x1_tsv("vtest") == []
+    assert messages == [("INFO", "No new user areas found. Doing nothing.")]
+
+    # tiler workers only log empty chunks, the merge reports them once
+    messages.clear()
+    client = _MockS3Client()
+    monkeypatch.setattr(rw_areas, "get_s3_client", lambda: client)
+    chunks = [
+        {
+            "features_1x1": "s3://bucket/vtest.tsv",
+            "geostores": f"s3://bucket/staging/{i}.json",
+            "output": f"s3://bucket/staging/{i}.tsv",
+            "count": 0,
+        }
+        for i in range(2)
+    ]
+    assert rw_areas.write_1x1_tsv(io.StringIO(), {}) == 0
+    assert rw_areas.merge_geostore_chunks(chunks) == []
+    assert messages == [("INFO", "No new user areas found. Doing nothing.")]
+
+
+def test_create_1x1_tsv_shards(monkeypatch, tmp_path):
+    shards = []
+
+    def mock_get_virtual_1x1_tsv(
+        tsv, geostore_ids, manifest, aliases, grid_size, deadline, pending
+    ):
+        shards.append(geostore_ids)
+        manifest += geostore_ids
+        tsv.write("geostore_id\tgeom\ttcl\tglad\n")
+        return len(geostore_ids)
+
+    for module in (rw_areas, manifests):
+        monkeypatch.setattr(
+            module,
+            "open_writer",
+            lambda uri: writers.LocalFileWriter(str(tmp_path / os.path.basename(uri))),
+        )
+    monkeypatch.setattr(rw_areas, "get_pending_areas", lambda: [])
+    monkeypatch.setattr(
+        rw_areas, "get_geostore_ids", lambda areas: [str(i) for i in range(7)]
+    )
+    monkeypatch.setattr(rw_areas, "get_virtual_1x1_tsv", mock_get_virtual_1x1_tsv)
+    monkeypatch.setattr(GLOBALS, "rw_areas_shard_size", 3)
+
+    uris = rw_areas.create_1x1_tsv("vtest")
+    assert [os.path.basename(uri) for uri in uris] == [
+        "vtest_0.tsv",
+        "vtest_1.tsv",
+        "vtest_2.tsv",
+    ]
+    assert [len(shard) for shard in shards] == [3, 3, 1]
+
+    monkeypatch.setattr(sync, "create_1x1_tsv", lambda version, deadline: uris)
+    config = DatapumpConfig(
+        analysis_version="vtest",
+        dataset="geostore",
+        dataset_version="vtest",
+        analysis=Analysis.tcl,
+        sync=True,
+        sync_type=SyncType.rw_areas,
+        metadata={"geotrellis_version": "1.0.0"},
+    )
+    jobs = sync.RWAreasSync("vtest").build_jobs(config)
+    assert [job.features_1x1 for job in jobs] == uris
+
+
+def test_parquet_feature_file(monkeypatch, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    polygon = box(10, 5, 10.5, 5.5)
+    rows = [
+        f"a\t{dumps(polygon, hex=True)}\tTrue\tFalse\n",
+        f"b\t{dumps(polygon, hex=True)}\tFalse\tTrue\n",
+    ]
+
+    uri = str(tmp_path / "vtest.parquet")
+    with rw_areas.open_feature_writer(uri) as features:
+        features.write(rw_areas.TSV_HEADER)
+        # rows may be split across writes
+        for row in rows:
+            features.write(row[:10])
+            features.write(row[10:])
+
+    table = pq.read_table(uri)
+    assert table.column("geostore_id").to_pylist() == ["a", "b"]
+    assert table.column("tcl").to_pylist() == [True, False]
+    assert table.column("glad").to_pylist() == [False, True]
+    assert loads(table.column("geom")[0].as_py()).equals(polygon)
+    assert json.loads(table.schema.metadata[b"geo"])["primary_column"] == "geom"
+    # with a TSV copy for full analyses, deleted with the other sidecars
+    with open(tmp_path / "vtest.tsv") as tsv_copy:
+        assert tsv_copy.read() == rw_areas.TSV_HEADER + "".join(rows)
+    assert manifests.get_sidecar_uris(uri)[-1] == str(tmp_path / "vtest.tsv")
+
+    job = GeotrellisJob(
+        id="test",
+        status=JobStatus.starting,
+        analysis_version="vtest",
+        sync_version="vtestsync",
+        sync_type=SyncType.rw_areas,
+        table=AnalysisInputTable(
+            dataset="geostore", version="vtestds", analysis=Analysis.tcl
+        ),
+        features_1x1="s3://gfw-pipelines-test/geotrellis/features/geostore/vtest.parquet",
+        geotrellis_version="1.3.0",
+    )
+    step_args = job._get_step()["HadoopJarStep"]["Args"]
+    assert step_args[step_args.index("--feature_format") + 1] == "parquet"
+
+    # full analyses keep reading the historical TSV feature files
+    monkeypatch.setattr(GLOBALS, "rw_areas_feature_format", "parquet")
+    assert DataApiClient().get_1x1_asset("geostore", "v1") == (
+        "s3://gfw-pipelines-test/geotrellis/features/geostore/*.tsv"
+    )
+
+
+def test_aoi_geostore_ids_manifest(monkeypatch):
+    client = _MockS3Client()
+    objects = client.objects
+    monkeypatch.setattr(rw_areas, "get_s3_client", lambda: client)
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: client)
+
+    aoi_src = "s3://bucket/geotrellis/features/geostore/vtest_1.tsv"
+    assert (
+        manifests.get_manifest_uri(aoi_src)
+        == "s3://bucket/geotrellis/features/geostore/manifests/vtest_1.ids.gz"
+    )
+
+    objects["geotrellis/features/geostore/vtest_1.tsv"] = (
+        b"geostore_id\tgeom\ttcl\tglad\na\t00\tTrue\tTrue\n"
+        b"a\t01\tTrue\tTrue\nb\t00\tFalse\tTrue\n"
+    )
+    assert manifests.get_aoi_geostore_ids(aoi_src) == {"a", "b"}
+
+    objects["geotrellis/features/geostore/manifests/vtest_1.ids.gz"] = gzip.compress(
+        b"a\nb\nc"
+    )
+    assert manifests.get_aoi_geostore_ids(aoi_src) == {"a", "b", "c"}
+
+
+def test_distributed_tiling(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(rw_areas, "get_s3_client", lambda: client)
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: client)
+    monkeypatch.setattr(writers, "get_s3_client", lambda: client)
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", _mock_grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+    monkeypatch.setattr(GLOBALS, "s3_bucket_pipeline", "bucket")
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_chunk_size", 2)
+
+    geostores = {
+        f"{i:032d}": _mock_geostore(f"{i:032d}", Point(i - 3, 0).buffer(0.8))
+        for i in range(5)
+    }
+    monkeypatch.setattr(
+        rw_areas, "_get_pending_shards", lambda: [sorted(geostores.keys())]
+    )
+    monkeypatch.setattr(
+        rw_areas,
+        "get_geostore",
+        lambda ids: {"data": [geostores[i] for i in ids]},
+    )
+
+    uris, chunks = rw_areas.stage_geostore_chunks("vtest")
+    assert uris == ["s3://bucket/geotrellis/features/geostore/vtest.tsv"]
+    assert len(chunks) == 3
+
+    chunks = [rw_areas.tile_geostore_chunk(chunk) for chunk in chunks]
+    assert rw_areas.merge_geostore_chunks(chunks) == uris
+
+    with rw_areas.geostore_to_wkb({"data": list(geostores.values())}) as (wkb, _):
+        expected = wkb.getvalue()
+
+    assert client.objects["geotrellis/features/geostore/vtest.tsv"] == expected.encode()
+    assert manifests.get_aoi_geostore_ids(uris[0]) == set(geostores.keys())
+    assert list(client.objects.keys()) == [
+        "geotrellis/features/geostore/vtest.tsv",
+        "geotrellis/features/geostore/manifests/vtest.ids.gz",
+    ]
+
+
+def test_tiling_checkpoint(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(rw_areas, "get_s3_client", lambda: client)
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: client)
+    monkeypatch.setattr(writers, "get_s3_client", lambda: client)
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", _mock_grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+    monkeypatch.setattr(GLOBALS, "s3_bucket_pipeline", "bucket")
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+    monkeypatch.setattr(GLOBALS, "rw_areas_checkpoint_batch_size", 2)
+
+    geostores = {
+        f"{i:032d}": _mock_geostore(f"{i:032d}", Point(i - 3, 0).buffer(0.8))
+        for i in range(5)
+    }
+    monkeypatch.setattr(
+        rw_areas, "_get_pending_shards", lambda: [sorted(geostores.keys())]
+    )
+    monkeypatch.setattr(
+        rw_areas,
+        "get_geostore",
+        lambda ids: {"data": [geostores[i] for i in ids]},
+    )
+
+    uris, chunks = rw_areas.stage_geostore_chunks("vtest")
+    assert len(chunks) == 1
+
+    # an expired deadline only leaves time for one batch per invocation
+    chunk = rw_areas.tile_geostore_chunk(chunks[0], Deadline(0))
+    invocations = 1
+    while "checkpoint" in chunk:
+        chunk = rw_areas.tile_geostore_chunk(chunk, Deadline(0))
+        invocations += 1
+
+    assert invocations == 3
+    assert len(chunk["parts"]) == 3
+    assert rw_areas.merge_geostore_chunks([chunk]) == uris
+
+    with rw_areas.geostore_to_wkb({"data": list(geostores.values())}) as (wkb, _):
+        expected = wkb.getvalue()
+
+    assert client.objects["geotrellis/features/geostore/vtest.tsv"] == expected.encode()
+    assert manifests.get_aoi_geostore_ids(uris[0]) == set(geostores.keys())
+    assert list(client.objects.keys()) == [
+        "geotrellis/features/geostore/vtest.tsv",
+        "geotrellis/features/geostore/manifests/vtest.ids.gz",
+    ]
+
+
+def test_geostore_to_wkb_dedup(monkeypatch):
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", _mock_grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+
+    geom = Point(0, 0).buffer(0.8)
+    # same area with its ring reversed and starting at another vertex
+    ring = geom.exterior.coords[:-1]
+    reoriented = Polygon(ring[7::-1] + ring[:7:-1])
+    geostore = {
+        "data": [
+            _mock_geostore("a", geom),
+            _mock_geostore("b", Point(2, 2).buffer(0.8)),
+            _mock_geostore("c", geom),
+            _mock_geostore("d", geom),
+            _mock_geostore("e", reoriented),
+        ]
+    }
+
+    with rw_areas.geostore_to_wkb({"data": geostore["data"][:2]}) as (wkb, count):
+        expected_tsv, expected_count = wkb.getvalue(), count
+
+    manifest, aliases = [], {}
+    with rw_areas.geostore_to_wkb(geostore, None, manifest, aliases) as (wkb, count):
+        assert wkb.getvalue() == expected_tsv
+        assert count == expected_count
+
+    assert aliases == {"a": ["c", "d", "e"]}
+    assert sorted(manifest) == ["a", "b", "c", "d", "e"]
+
+
+def test_sweep_tile_cache(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(tile_cache, "get_s3_client", lambda: client)
+    monkeypatch.setattr(GLOBALS, "rw_areas_tile_cache_ttl_days", 30)
+
+    prefix = tile_cache.TILE_CACHE_PREFIX
+    for key in ["v2_etag/a.tsv", "v2_etag/b.tsv", "v1_etag/a.tsv"]:
+        client.put_object("bucket", f"{prefix}/{key}", "rows")
+    client.last_modified[f"{prefix}/v2_etag/b.tsv"] -= timedelta(days=31)
+    client.last_modified[f"{prefix}/v1_etag/a.tsv"] -= timedelta(days=10)
+
+    assert tile_cache.sweep_tile_cache() == 1
+    assert sorted(client.objects) == [
+        f"{prefix}/v1_etag/a.tsv",
+        f"{prefix}/v2_etag/a.tsv",
+    ]
+
+    assert tile_cache.sweep_tile_cache(ttl_days=7) == 1
+    assert sorted(client.objects) == [f"{prefix}/v2_etag/a.tsv"]
+
+
+def test_expand_geostore_aliases(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: client)
+    monkeypatch.setattr(writers, "get_s3_client", lambda: client)
+
+    client.objects[
+        "results/summary/part-0.csv"
+    ] = b"geostore__id\tarea__ha\na\t1.0\nb\t2.0\n"
+
+    for _ in range(2):
+        manifests.expand_geostore_aliases(
+            "s3://bucket/results/summary/part-0.csv", {"a": ["c", "d"]}
+        )
+        assert client.objects["results/summary/part-0.csv"] == (
+            b"geostore__id\tarea__ha\na\t1.0\nc\t1.0\nd\t1.0\nb\t2.0\n"
+        )
+
+
+def test_expand_geostore_aliases_full_analysis(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(geotrellis, "get_s3_client", lambda: client)
+    monkeypatch.setattr(manifests, "get_s3_client", lambda: client)
+    monkeypatch.setattr(writers, "get_s3_client", lambda: client)
+
+    features = "geotrellis/features/geostore"
+    client.objects[f"{features}/manifests/v1.aliases.json"] = b'{"a": ["c"]}'
+    client.objects[f"{features}/manifests/v2_0.aliases.json"] = b'{"a": ["d"]}'
+    client.objects[f"{features}/manifests/v2_0.ids.gz"] = b""
+    result = "geotrellis/results/v3/geostore/v3/annualupdate_minimal/summary/0.csv"
+    client.objects[result] = b"geostore__id\tarea__ha\na\t1.0\nb\t2.0\n"
+
+    # full analyses read every feature file, without a sync type
+    job = GeotrellisJob(
+        id="test",
+        status=JobStatus.executing,
+        analysis_version="v3",
+        table=AnalysisInputTable(
+            dataset="geostore", version="v3", analysis=Analysis.tcl
+        ),
+        features_1x1=f"s3://gfw-pipelines-test/{features}/*.tsv",
+        feature_type="geostore",
+        geotrellis_version="1.3.0",
+    )
+    job._expand_geostore_aliases()
+
+    assert client.objects[result] == (
+        b"geostore__id\tarea__ha\na\t1.0\nc\t1.0\nd\t1.0\nb\t2.0\n"
+    )
+
+
+def test_geostore_to_wkb_tile_cache(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(tile_cache, "get_s3_client", lambda: client)
+    grid = _mock_grid()
+    grid.tag = "etag"
+
+    monkeypatch.setattr(rw_areas, "_get_extent_1x1", lambda: grid)
+    monkeypatch.setattr(rw_areas, "update_area_statuses", lambda ids, status: 200)
+    monkeypatch.setattr(GLOBALS, "rw_areas_tiling_processes", 1)
+    monkeypatch.setattr(GLOBALS, "s3_bucket_pipeline", "bucket")
+
+    geostore = {
+        "data": [
+            _mock_geostore("a", Point(0, 0).buffer(0.8)),
+            _mock_geostore("b", Point(2, 2).buffer(0.8)),
+            _mock_geostore("c", Point(100, 0).buffer(0.8)),
+        ]
+    }
+
+    monkeypatch.setattr(GLOBALS, "rw_areas_tile_cache", False)
+    with rw_areas.geostore_to_wkb(geostore) as (wkb, count):
+        expected_tsv, expected_count = wkb.getvalue(), count
+
+    monkeypatch.setattr(GLOBALS, "rw_areas_tile_cache", True)
+    with rw_areas.geostore_to_wkb(geostore) as (wkb, count):
+        assert (wkb.getvalue(), count) == (expected_tsv, expected_count)
+
+    cache_tag = tile_cache.get_cache_tag(
+        "etag",
+        max_vertices=GLOBALS.rw_areas_max_vertices,
+        repair_fast_path=int(GLOBALS.rw_areas_repair_fast_path),
+    )
+    assert cache_tag.startswith("v2_etag_") and "repair_fast_path1" in cache_tag
+    prefix = f"geotrellis/features/geostore_cache/{cache_tag}"
+    assert sorted(client.objects.keys()) == [f"{prefix}/{i}.tsv" for i in "abc"]
+    assert client.objects[f"{prefix}/c.tsv"] == b""
+
+    # cached rows are reused without tiling again
+    monkeypatch.setattr(rw_areas, "tile_geometry", None)
+    with rw_areas.geostore_to_wkb(geostore) as (wkb, count):
+        assert (wkb.getvalue(), count) == (expected_tsv, expected_count)
+
+    # expired entries are evicted
+    client.last_modified[f"{prefix}/a.tsv"] -= timedelta(days=31)
+    assert tile_cache.get_cached_tiles(["a", "b"], cache_tag).keys() == {"b"}
+    assert f"{prefix}/a.tsv" not in client.objects
+
+
+def test_process_active_fire_alerts(monkeypatch, tmp_path):
+    client = _MockS3Client()
+    monkeypatch.setattr(fire_alerts, "get_s3_client", lambda: client)
+    (tmp_path / "result").mkdir()
+    monkeypatch.setattr(fire_alerts, "TEMP_DIR", str(tmp_path / "result"))
+    monkeypatch.setattr(
+        fire_alerts,
+        "_get_last_saved_alert_time",
+        lambda alert_type: ("2024-05-02", "0130"),
+    )
+
+    # unsorted, with alerts before, at and after the last saved alert time
+    alerts = [
+        (10.5, -1.25, date(2024, 5, 2), "0200", "nominal", 330.5, 290.25, 1.5),
+        (11.0, -2.0, date(2024, 5, 1), "2359", "high", 340.0, 295.0, 2.0),
+        (12.25, -3.5, date(2024, 5, 3), "0005", "low", 310.75, 280.0, None),
+        (13.0, -4.0, date(2024, 5, 2), "0130", "high", 320.0, 285.0, 3.0),
+        (14.5, -5.75, date(2024, 5, 2), "0131", "high", 325.0, 286.5, 4.25),
+        (15.0, -6.0, date(2024, 5, 2), "0300", "high", 335.0, 288.0, 5.0),
+    ]
+    # deleted records are left out, along with their points
+    content = _mock_firms_zip(tmp_path, "viirs", "7d", alerts, deleted=[5])
+    requests = []
+
+    def _get(url, headers, stream=False):
+        requests.append((url, headers))
+        return _MockResponse(content, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(fire_alerts.requests, "get", _get)
+
+    uri, last_date = fire_alerts.process_active_fire_alerts("viirs")
+
+    key = (
+        "nasa_viirs_fire_alerts/v1/vector/epsg-4326/tsv/near_real_time/"
+        "2024-05-02-0131_2024-05-03-0005.tsv"
+    )
+    assert uri == f"s3a://gfw-data-lake-test/{key}"
+    assert last_date == "2024-05-03"
+    # only the result is written to disk, the shapefile is never extracted
+    assert os.listdir(tmp_path / "result") == ["fire_alerts_viirs.tsv"]
+    assert client.objects[key] == (
+        b"latitude\tlongitude\tacq_date\tacq_time\tconfidence\t"
+        b"bright_ti4\tbright_ti5\tfrp\r\n"
+        b"-5.75\t14.5\t2024-05-02\t0131\th\t325.0\t286.5\t4.25\r\n"
+        b"-1.25\t10.5\t2024-05-02\t0200\tn\t330.5\t290.25\t1.5\r\n"
+        b"-3.5\t12.25\t2024-05-03\t0005\tl\t310.75\t280.0\t\r\n"
+    )
+
+    assert fire_alerts._get_watermark("viirs") == key
+
+    # unchanged feeds are skipped, whether or not FIRMS honors If-None-Match
+    assert requests == [
+        (fire_alerts.ACTIVE_FIRE_ALERTS_SHAPEFILE_URLS["viirs"].format(window="7d"), {})
+    ]
+    assert fire_alerts.process_active_fire_alerts("viirs") is None
+    assert requests[-1][1] == {"If-None-Match": '"v1"'}
+
+    monkeypatch.setattr(
+        fire_alerts.requests,
+        "get",
+        lambda url, headers, stream=False: _MockResponse(b"", status_code=304),
+    )
+    assert fire_alerts.process_active_fire_alerts("viirs") is None
+
+
+def test_get_last_saved_alert_time(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(fire_alerts, "get_s3_client", lambda: client)
+    monkeypatch.setattr(GLOBALS, "s3_bucket_pipeline", "bucket")
+
+    assert fire_alerts._get_last_saved_alert_time("modis") == ("0000-00-00", "0000")
+
+    directory = fire_alerts.get_nrt_s3_directory("modis")
+    for name in [
+        "2024-05-01-0000_2024-05-01-2359.tsv",
+        "2024-05-02-0010_2024-05-02-1200.tsv",
+        "_manifests/2024-05-03-0000_2024-05-03-2359.json",
+        "2024-05-09-0000_2024-05-09-2359.tsv.tmp",
+    ]:
+        client.put_object("bucket", f"{directory}/{name}", b"")
+
+    # without a watermark the whole directory is listed, then saved to one
+    assert fire_alerts._get_last_saved_alert_time("modis") == ("2024-05-02", "1200")
+    assert fire_alerts._get_watermark("modis") == (
+        f"{directory}/2024-05-02-0010_2024-05-02-1200.tsv"
+    )
+
+    # afterward only files past the watermark are listed
+    client.put_object("bucket", f"{directory}/2024-05-02-1201_2024-05-03-0400.tsv", b"")
+    assert fire_alerts._get_last_saved_alert_time("modis") == ("2024-05-03", "0400")
+    assert client.list_calls[-1]["StartAfter"] == (
+        f"{directory}/2024-05-02-0010_2024-05-02-1200.tsv"
+    )
+    assert fire_alerts._get_last_saved_alert_time("modis") == ("2024-05-03", "0400")
+
+
+def test_compact_nrt_alerts(monkeypatch):
+    client = _MockS3Client()
+    monkeypatch.setattr(fire_alerts, "get_s3_client", lambda: client)
+    monkeypatch.setattr(nrt_compaction, "get_s3_client", lambda: client)
+    monkeypatch.setattr(writers, "get_s3_client", lambda: client)
+    monkeypatch.setattr(GLOBALS, "s3_bucket_pipeline", "bucket")
+    emr_client = _MockEMRClient()
+    monkeypatch.setattr(nrt_compaction, "get_emr_client", lambda: emr_client)
+
+    directory = fire_alerts.get_nrt_s3_directory("viirs")
+    names = [
+        "2024-04-29-0100_2024-04-29-0500.tsv",
+        "2024-04-30-2300_2024-05-01-0200.tsv",
+        "2024-05-01-0300_2024-05-01-0900.tsv",
+        "2024-05-01-1000_2024-05-01-2200.tsv",
+        "2024-05-02-0100_2024-05-02-0400.tsv",
+        "2024-05-03-0100_2024-05-03-0400.tsv",
+        # backfilled, overlapping the file before it
+        "2024-05-03-0200_2024-05-03-0300.tsv",
+        "2024-05-03-0500_2024-05-03-0600.tsv",
+    ]
+    for name in names:
+        client.put_object(
+            "bucket", f"{directory}/{name}", f"latitude\tlongitude\r\n{name}\t0\r\n"
+        )
+    last_saved_alert_time = fire_alerts._get_last_saved_alert_time("viirs")
+
+    # nothing is compacted while an analysis may read the files
+    emr_client.clusters = {"j-1": [{"Key": "Analysis", "Value": "viirs"}]}
+    assert nrt_compaction.compact_nrt_alerts("viirs", "day") == []
+    assert all(f"{directory}/{name}" in client.objects for name in names)
+    emr_client.clusters = {"j-1": [{"Key": "Analysis", "Value": "modis"}]}
+
+    # only complete days with more than one file are merged
+    assert nrt_compaction.compact_nrt_alerts("viirs", "day") == [
+        f"{directory}/2024-05-01-0300_2024-05-01-2200.tsv"
+    ]
+    assert client.objects[f"{directory}/2024-05-01-0300_2024-05-01-2200.tsv"] == (
+        f"latitude\tlongitude\r\n{names[2]}\t0\r\n{names[3]}\t0\r\n".encode()
+    )
+    assert json.loads(
+        client.objects[f"{directory}/_manifests/2024-05-01-0300_2024-05-01-2200.json"]
+    ) == {
+        "key": f"{directory}/2024-05-01-0300_2024-05-01-2200.tsv",
+        "sources": [f"{directory}/{names[2]}", f"{directory}/{names[3]}"],
+    }
+    assert f"{directory}/{names[2]}" not in client.objects
+    assert f"{directory}/{names[-3]}" in client.objects
+    assert f"{directory}/{names[-2]}" in client.objects
+    assert f"{directory}/{names[-1]}" in client.objects
+
+    # the last saved alert time is unchanged, also when listing without a watermark
+    client.objects.pop("fire_alerts/viirs/watermark.json")
+    assert fire_alerts._get_last_saved_alert_time("viirs") == last_saved_alert_time
+
+    # a merge interrupted before deleting its sources is finished first, while
+    # overlaps no manifest explains are left alone
+    client.put_object("bucket", f"{directory}/{names[3]}", b"")
+    assert nrt_compaction.compact_nrt_alerts("viirs", "day") == []
+    assert f"{directory}/{names[3]}" not in client.objects
+    assert f"{directory}/{names[-2]}" in client.objects
+
+    # a merge interrupted before writing the merged file leaves its sources
+    def _failing_writer(uri):
+        raise IOError("interrupted")
+
+    monkeypatch.setattr(nrt_compaction, "open_writer", _failing_writer)
+    with pytest.raises(IOError):
+        nrt_compaction.compact_nrt_alerts("viirs", "month")
+    assert f"{directory}/_manifests/2024-04-29-0100_2024-05-01-0200.json" in (
+        client.objects
+    )
+    assert f"{directory}/{names[0]}" in client.objects
+    assert f"{directory}/{names[1]}" in client.objects
+
+    monkeypatch.setattr(nrt_compaction, "open_writer", writers.open_writer)
+    assert nrt_compaction.compact_nrt_alerts("viirs", "month") == [
+        f"{directory}/2024-04-29-0100_2024-05-01-0200.tsv"
+    ]
+    assert nrt_compaction.compact_nrt_alerts("viirs", "month") == []
+    assert fire_alerts._get_last_saved_alert_time("viirs") == last_saved_alert_time
+
+
+def test_get_feed_window():
+    now = datetime(2024, 5, 10, 12, 0, tzinfo=timezone.utc)
+
+    assert fire_alerts.get_feed_window("0000-00-00", "0000", now) == "7d"
+    assert fire_alerts.get_feed_window("2024-05-10", "0300", now) == "24h"
+    assert fire_alerts.get_feed_window("2024-05-09", "1800", now) == "24h"
+    assert fire_alerts.get_feed_window("2024-05-09", "1759", now) == "48h"
+    assert fire_alerts.get_feed_window("2024-05-05", "0000", now) == "7d"
+    assert fire_alerts.get_feed_window("2024-04-01", "0000", now) == "7d"
+
+
+class _MockS3Client:
+    """
+    In-memory S3 client for the calls made by rw_areas and writers
+    """
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    class _Body(io.BytesIO):
+        def iter_lines(self):
+            return iter(self.read().splitlines())
+
+        def iter_chunks(self, chunk_size=1024):
+            return iter(lambda: self.read(chunk_size), b"")
+
+    def __init__(self):
+        self.objects = {}
+        self.last_modified = {}
+        self.list_calls = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body.encode() if isinstance(Body, str) else Body
+        self.last_modified[Key] = datetime.now(timezone.utc)
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey()
+        return {
+            "Body": self._Body(self.objects[Key]),
+            "LastModified": self.last_modified.get(Key, datetime.now(timezone.utc)),
+        }
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key):
+        self.put_object(Bucket, Key, Fileobj.read())
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix, Delimiter=None, StartAfter=""):
+        self.list_calls.append({"Prefix": Prefix, "StartAfter": StartAfter})
+        keys = [
+            key
+            for key in sorted(self.objects)
+            if key.startswith(Prefix)
+            and key > StartAfter
+            and not (Delimiter and Delimiter in key[len(Prefix) :])
+        ]
+        contents = [
+            {"Key": key, "LastModified": self.last_modified.get(key)} for key in keys
+        ]
+        return [{"Contents": contents}] if keys else [{}]
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.delete_object(Bucket, obj["Key"])
+
+
+class _MockEMRClient:
+    """
+    EMR client listing clusters with their tags
+    """
+
+    def __init__(self):
+        self.clusters = {}
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, ClusterStates):
+        return [{"Clusters": [{"Id": cluster_id} for cluster_id in self.clusters]}]
+
+    def describe_cluster(self, ClusterId):
+        return {"Cluster": {"Id": ClusterId, "Tags": self.clusters[ClusterId]}}
+
+
+class _MockResponse:
+    """
+    Streamed response of requests
+    """
+
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        return (
+            self.content[i : i + chunk_size]
+            for i in range(0, len(self.content), chunk_size)
+        )
+
+
+def _mock_grid():
+    return TileGrid.from_tiles(
+        (box(x, y, x + 1, y + 1), x % 2 == 0, y % 2 == 0)
+        for x in range(-5, 5)
+        for y in range(-5, 5)
+    )
+
+
+def _mock_geostore(geostore_id, geom):
+    return {
+        "geostoreId": geostore_id,
+        "geostore": {
+            "data": {
+                "attributes": {
+                    "areaHa": geom.area,
+                    "geojson": {"features": [{"geometry": mapping(geom)}]},
+                }
+            }
+        },
+    }
+
+
+def _mock_firms_zip(tmp_path, alert_type, window, alerts, deleted=()):
+    """
+    Zipped point shapefile in the layout of the FIRMS feeds, with the records
+    at the deleted indices flagged as deleted
+    """
+    base = str(tmp_path / fire_alerts.SHP_NAMES[alert_type].format(window=window)[:-4])
+    writer = shapefile.Writer(base, shapeType=shapefile.POINT)
+    writer.field("LATITUDE", "N", 10, 4)
+    writer.field("LONGITUDE", "N", 10, 4)
+    writer.field("ACQ_DATE", "D")
+    writer.field("ACQ_TIME", "C", 4)
+    writer.field("CONFIDENCE", "C", 8)
+    for field in fire_alerts.BRIGHTNESS_FIELDS[alert_type] + ["frp"]:
+        writer.field(field.upper(), "N", 8, 2)
+
+    for x, y, *record in alerts:
+        writer.point(x, y)
+        writer.record(y, x, *record)
+    writer.close()
+
+    with open(f"{base}.dbf", "r+b") as dbf:
+        header_length, record_length = struct.unpack("<8xHH", dbf.read(12))
+        for i in deleted:
+            dbf.seek(header_length + i * record_length)
+            dbf.write(b"*")
+
+    zip_file = io.BytesIO()
+    with zipfile.ZipFile(zip_file, "w") as z:
+        for ext in ("shp", "shx", "dbf"):
+            z.write(f"{base}.{ext}", os.path.basename(f"{base}.{ext}"))
+    return zip_file.getvalue()
+
+
+def _all_tiles(grid):
+    return grid.candidates(box(-180, -90, 180, 90))
+
+
 EXPECTED = {
     "Name": "viirs",
     "ActionOnFailure": "TERMINATE_CLUSTER",